@@ -1,26 +1,35 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.response import Response
+from naita_servicedesk.conditional import BRANCHES
+from naita_servicedesk.reference import reference_response
+from users.authentication import ClaimsAuthenticationMixin
 from .models import Branch
 from .serializers import BranchSerializer
 
 # -----------------------------
 # Branch ViewSet
 # -----------------------------
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(ClaimsAuthenticationMixin, viewsets.ModelViewSet):
     """
     - Admin users: Full CRUD
     - Staff/Technicians: Read-only
     """
     queryset = Branch.objects.all()
     serializer_class = BranchSerializer
+    claims_actions = ("list", "retrieve")
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
+    def list(self, request, *args, **kwargs):
+        return reference_response(
+            request, "branch_list", [BRANCHES],
+            lambda: self.get_serializer(self.get_queryset(), many=True).data, private=True,
+        )
+
 
 # -----------------------------
 # Staff/Technician Branch Endpoint
@@ -31,5 +40,7 @@ def staff_branches(request):
     """
     Simple list of branches for staff/technicians
     """
-    branches = Branch.objects.all().values("id", "name", "location")
-    return Response(list(branches))
+    return reference_response(
+        request, "staff_branches", [BRANCHES],
+        lambda: list(Branch.objects.all().values("id", "name", "location")), private=True,
+    )
@@ -1,8 +1,17 @@
 from rest_framework import viewsets, permissions
+from naita_servicedesk.conditional import CATEGORIES
+from naita_servicedesk.reference import reference_response
+from users.authentication import ClaimsAuthenticationMixin
 from .models import Category
 from .serializers import CategorySerializer
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ClaimsAuthenticationMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
+    claims_actions = ("list", "retrieve")
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+
+    def list(self, request, *args, **kwargs):
+        return reference_response(
+            request, "categories", [CATEGORIES], lambda: self.get_serializer(self.get_queryset(), many=True).data
+        )
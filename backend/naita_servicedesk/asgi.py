@@ -1,8 +1,6 @@
 import os
 import django
-from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 
 # -----------------------------
 # Django setup
@@ -10,8 +8,10 @@ from channels.auth import AuthMiddlewareStack
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "naita_servicedesk.settings")
 django.setup()
 
+from naita_servicedesk.handlers import get_asgi_application
+
 # -----------------------------
-# Django ASGI application
+# Django ASGI application (/api/ on the slim middleware chain)
 # -----------------------------
 django_asgi_app = get_asgi_application()
 
@@ -19,6 +19,8 @@ django_asgi_app = get_asgi_application()
 # Import WebSocket routes
 # -----------------------------
 import notifications.routing
+import tickets.routing
+from notifications.auth import JWTAuthMiddlewareStack
 
 # -----------------------------
 # Main ASGI application
@@ -28,10 +30,11 @@ application = ProtocolTypeRouter(
         # HTTP → normal Django views
         "http": django_asgi_app,
 
-        # WebSocket → handled by Channels + middleware
-        "websocket": AuthMiddlewareStack(
+        # WebSocket → JWT (stateless) or session auth, then Channels routing
+        "websocket": JWTAuthMiddlewareStack(
             URLRouter(
                 notifications.routing.websocket_urlpatterns
+                + tickets.routing.websocket_urlpatterns
             )
         ),
     }
@@ -0,0 +1,32 @@
+# naita_servicedesk/checks.py
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Version counters (ETags, reference data, ticket pages) and identity rows
+    live in the default cache; a process-local one keeps every worker on its
+    own versions, so changes reach other workers only when entries expire.
+    """
+    if settings.DEBUG or settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Set CACHE_REDIS_URL when running more than one process (web workers, "
+                "SLA scheduler): ETag and page-cache version counters are per process, "
+                "and branch, division and category changes reach other workers only "
+                "after REFERENCE_CACHE_SECONDS."
+            ),
+            id="naita_servicedesk.W001",
+        )
+    ]
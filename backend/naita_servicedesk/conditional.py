@@ -0,0 +1,114 @@
+# naita_servicedesk/conditional.py
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+VERSION_KEY = "version:{}"
+
+# Per-table version scopes (bumped from tickets/signals.py)
+BRANCHES = "branches"
+CATEGORIES = "categories"
+DIVISIONS = "divisions"
+USERS = "users"
+
+
+# -----------------------------
+# Version counters
+# -----------------------------
+def get_version(scope):
+    """Current version of `scope`, shared by every process using the same cache."""
+    key = VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a counter lost to eviction or a restart
+        # never repeats a version (and so an ETag) handed out before
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key) or time.time_ns()
+    return version
+
+
+def get_versions(*scopes):
+    """Versions of several scopes in one cache round trip."""
+    found = cache.get_many([VERSION_KEY.format(scope) for scope in scopes])
+    return tuple(found.get(VERSION_KEY.format(scope)) or get_version(scope) for scope in scopes)
+
+
+def bump_version(scope):
+    key = VERSION_KEY.format(scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+# -----------------------------
+# Validators
+# -----------------------------
+def _validator_aggregates(related):
+    aggregates = {"latest": Max("updated_at"), "count": Count("pk")}
+    aggregates.update({path: Max(path) for path in related})
+    return aggregates
+
+
+def queryset_validator(queryset, *related):
+    """
+    (latest updated_at, row count): any insert, update or delete in the scope
+    changes it. `related` adds the latest value of further timestamp paths
+    (e.g. "ticket__updated_at") for bodies that embed related rows.
+    """
+    aggregates = _validator_aggregates(related)
+    stats = queryset.order_by().aggregate(**aggregates)
+    return tuple(stats[name] for name in aggregates)
+
+
+async def aqueryset_validator(queryset, *related):
+    aggregates = _validator_aggregates(related)
+    stats = await queryset.order_by().aaggregate(**aggregates)
+    return tuple(stats[name] for name in aggregates)
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+# -----------------------------
+# Conditional GET
+# -----------------------------
+def conditional_response(request, validator, respond, private=True):
+    """
+    `304 Not Modified` when the client's If-None-Match matches the ETag of
+    (URL, `validator`), otherwise `respond()` with that ETag. Nothing is
+    queried or serialized beyond the validator for an unchanged resource.
+
+    `validator` must change whenever the body would; per-user responses
+    (`private`) are marked for revalidation and never shared by proxies.
+    """
+    etag = make_etag(request.get_full_path(), validator)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = respond()
+    return _tag(response, etag, private)
+
+
+async def aconditional_response(request, validator, respond, private=True):
+    """conditional_response for async views: `respond` is a coroutine function."""
+    etag = make_etag(request.get_full_path(), validator)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await respond()
+    return _tag(response, etag, private)
+
+
+def _tag(response, etag, private):
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+    if private:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization", "Cookie"])
+    return response
@@ -0,0 +1,140 @@
+# naita_servicedesk/handlers.py
+
+import logging
+
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("django.request")
+
+
+def is_api_path(path_info):
+    return path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SlimMiddlewareMixin:
+    """
+    Handler built with API_MIDDLEWARE instead of MIDDLEWARE.
+
+    BaseHandler.load_middleware (Django 5.2) with only the settings list
+    changed; settings are never written, so handlers built concurrently
+    (or later, by the test client) still see the full MIDDLEWARE.
+    """
+
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, "sync_capable", True)
+            middleware_can_async = getattr(middleware, "async_capable", False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    "Middleware %s must have at least one of "
+                    "sync_capable/async_capable set to True." % middleware_path
+                )
+            elif not handler_is_async and middleware_can_sync:
+                middleware_is_async = False
+            else:
+                middleware_is_async = middleware_can_async
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async,
+                    handler,
+                    handler_is_async,
+                    debug=settings.DEBUG,
+                    name="middleware %s" % middleware_path,
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed as exc:
+                if settings.DEBUG:
+                    if str(exc):
+                        logger.debug("MiddlewareNotUsed(%r): %s", middleware_path, exc)
+                    else:
+                        logger.debug("MiddlewareNotUsed: %r", middleware_path)
+                continue
+            else:
+                handler = adapted_handler
+
+            if mw_instance is None:
+                raise ImproperlyConfigured("Middleware factory %s returned None." % middleware_path)
+
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response),
+                )
+            if hasattr(mw_instance, "process_exception"):
+                # The exception stack is always synchronous
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        # The chain doubles as BaseHandler's "initialization complete" flag: assign it last
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class APIASGIHandler(SlimMiddlewareMixin, ASGIHandler):
+    pass
+
+
+class APIWSGIHandler(SlimMiddlewareMixin, WSGIHandler):
+    pass
+
+
+# ======================================================
+# Routing handlers
+# ======================================================
+class RoutingASGIHandler(ASGIHandler):
+    """
+    Sends API_PATH_PREFIX requests through the slim API chain; admin, staff
+    dashboard and every other page keep the full MIDDLEWARE.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.api_handler = APIASGIHandler()
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        if scope["type"] == "http" and is_api_path(path):
+            return await self.api_handler(scope, receive, send)
+        return await super().__call__(scope, receive, send)
+
+
+class RoutingWSGIHandler(WSGIHandler):
+    """WSGI counterpart of RoutingASGIHandler (runserver, gunicorn)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.api_handler = APIWSGIHandler()
+
+    def __call__(self, environ, start_response):
+        if is_api_path(environ.get("PATH_INFO", "")):
+            return self.api_handler(environ, start_response)
+        return super().__call__(environ, start_response)
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return RoutingASGIHandler() if settings.API_SLIM_MIDDLEWARE else ASGIHandler()
+
+
+def get_wsgi_application():
+    django.setup(set_prefix=False)
+    return RoutingWSGIHandler() if settings.API_SLIM_MIDDLEWARE else WSGIHandler()
@@ -0,0 +1,159 @@
+# naita_servicedesk/identity.py
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework import serializers
+
+# Per-request L1: {cache key: instance}, None outside a request (scheduler, consumers)
+_request_objects = ContextVar("identity_request_objects", default=None)
+
+
+# ======================================================
+# Identity Cache
+# ======================================================
+class IdentityCache:
+    """
+    Read-through cache of small, hot rows by primary key.
+
+    L1 is a dict living for one request (identity_cache_middleware), so a
+    row is loaded at most once per request and every lookup returns the
+    same instance. L2 is the shared Django cache (IDENTITY_CACHE_SECONDS).
+    Saving or deleting a row drops it from both, again after commit so a
+    concurrent reader cannot put the old row back. `deferred` fields (the
+    user's password hash) are never loaded into the cache.
+
+    QuerySet.update() sends no signals: code bulk-updating a cached model
+    must call `invalidate` for the affected rows, or readers keep the old
+    row for up to IDENTITY_CACHE_SECONDS.
+    """
+
+    def __init__(self, model_label, deferred=()):
+        self.model_label = model_label
+        self.deferred = deferred
+        for signal in (post_save, post_delete):
+            signal.connect(
+                self._on_change, sender=model_label, weak=False,
+                dispatch_uid=f"identity_cache:{model_label}:{signal is post_save}",
+            )
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def key(self, pk):
+        return f"identity:{self.model_label}:{pk}"
+
+    def get(self, pk):
+        """Instance with this primary key, or None if there is none."""
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+        if pk is None:
+            return None
+
+        key = self.key(pk)
+        local = _request_objects.get()
+        if local is not None and key in local:
+            return local[key]
+
+        obj = cache.get(key)
+        if obj is None:
+            obj = self.model._default_manager.defer(*self.deferred).filter(pk=pk).first()
+            if obj is not None:
+                cache.set(key, obj, settings.IDENTITY_CACHE_SECONDS)
+        if local is not None and obj is not None:
+            local[key] = obj
+        return obj
+
+    def invalidate(self, pk):
+        key = self.key(pk)
+        local = _request_objects.get()
+        if local is not None:
+            local.pop(key, None)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+    def _on_change(self, sender, instance, **kwargs):
+        # Covers role, branch and is_active changes of users alike
+        self.invalidate(instance.pk)
+
+
+user_cache = IdentityCache(settings.AUTH_USER_MODEL, deferred=("password",))
+branch_cache = IdentityCache("branches.Branch")
+category_cache = IdentityCache("categories.Category")
+
+_caches = {c.model_label.lower(): c for c in (user_cache, branch_cache, category_cache)}
+
+
+def cached_related(instance, name):
+    """
+    `getattr(instance, name)` for a foreign key, resolved through the
+    identity cache of the related model when it has one.
+    """
+    field = instance._meta.get_field(name)
+    if field.is_cached(instance):
+        return getattr(instance, name)
+    related_cache = _caches.get(field.related_model._meta.label_lower)
+    pk = getattr(instance, field.attname)
+    if related_cache is None or pk is None:
+        return getattr(instance, name)
+    obj = related_cache.get(pk)
+    if obj is None:
+        return getattr(instance, name)  # raises DoesNotExist like the descriptor
+    field.set_cached_value(instance, obj)
+    return obj
+
+
+# -----------------------------
+# Serializer field
+# -----------------------------
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField resolving ids through the model's identity cache."""
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        related_cache = _caches.get(model._meta.label_lower)
+        if related_cache is None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            model._meta.pk.to_python(data)
+        except (TypeError, ValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        obj = related_cache.get(data)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+# -----------------------------
+# Request scope
+# -----------------------------
+@sync_and_async_middleware
+def identity_cache_middleware(get_response):
+    """Give every request its own L1 and drop it afterwards."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _request_objects.set({})
+            try:
+                return await get_response(request)
+            finally:
+                _request_objects.reset(token)
+    else:
+        def middleware(request):
+            token = _request_objects.set({})
+            try:
+                return get_response(request)
+            finally:
+                _request_objects.reset(token)
+    return middleware
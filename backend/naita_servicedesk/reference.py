@@ -0,0 +1,66 @@
+# naita_servicedesk/reference.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from .conditional import get_versions, make_etag
+
+
+# ======================================================
+# Reference Data Cache
+# ======================================================
+class ReferenceCache:
+    """
+    Pre-rendered JSON of rarely changing tables (branches, divisions,
+    categories) kept in process memory.
+
+    Each entry remembers the table versions it was rendered at. A request
+    only reads those versions (one cache round trip) and re-renders when a
+    save/delete signal in any process sharing the cache has bumped one.
+    Entries also expire after REFERENCE_CACHE_SECONDS, which bounds
+    staleness when processes do not share the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> (versions, expires, etag, content)
+
+    def get(self, name, scopes, build):
+        """(etag, JSON bytes) of `build()` at the current versions of `scopes`."""
+        versions = get_versions(*scopes)
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != versions or entry[1] <= now:
+            # Versions are read first: a concurrent bump makes the next request re-render
+            content = JSONRenderer().render(build())
+            # Tagged by content: an expired entry re-rendered at unchanged versions may differ
+            entry = (versions, now + settings.REFERENCE_CACHE_SECONDS, make_etag(name, content), content)
+            with self._lock:
+                self._entries[name] = entry
+        return entry[2], entry[3]
+
+
+reference_cache = ReferenceCache()
+
+
+def reference_response(request, name, scopes, build, private=False):
+    """
+    Cached JSON with a long max-age (REFERENCE_CACHE_MAX_AGE) and an ETag,
+    so expired browser copies revalidate with a 304.
+    """
+    etag, content = reference_cache.get(name, scopes, build)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type="application/json")
+    response["ETag"] = etag
+    if private:
+        patch_cache_control(response, private=True, max_age=settings.REFERENCE_CACHE_MAX_AGE)
+        patch_vary_headers(response, ["Authorization", "Cookie"])
+    else:
+        patch_cache_control(response, public=True, max_age=settings.REFERENCE_CACHE_MAX_AGE)
+    return response
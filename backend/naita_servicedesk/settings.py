@@ -53,6 +53,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # must be before CommonMiddleware
+    "naita_servicedesk.identity.identity_cache_middleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -63,6 +64,21 @@ MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusAfterMiddleware",
 ]
 
+# Requests under API_PATH_PREFIX authenticate with bearer tokens and never
+# render HTML. With API_SLIM_MIDDLEWARE on they run through API_MIDDLEWARE
+# (naita_servicedesk/handlers.py): no sessions, CSRF, auth, messages or
+# clickjacking middleware, so session cookies do not authenticate API calls.
+API_SLIM_MIDDLEWARE = os.getenv("API_SLIM_MIDDLEWARE", "True").lower() in ("true", "1", "t")
+API_PATH_PREFIX = "/api/"
+API_MIDDLEWARE = [
+    "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "naita_servicedesk.identity.identity_cache_middleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django_prometheus.middleware.PrometheusAfterMiddleware",
+]
+
 # -----------------------------
 # URLs & Templates
 # -----------------------------
@@ -113,14 +129,82 @@ DATABASES = {
 # -----------------------------
 # Channels / Redis
 # -----------------------------
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {
-            "hosts": [("127.0.0.1", 6379)],
+# CHANNEL_LAYER=local uses the bundled in-process layer (single-node installs,
+# no Redis); set CHANNEL_LAYER_SOCKET_DIR to reach other processes on the host
+# such as the SLA scheduler
+if os.getenv("CHANNEL_LAYER", "redis").lower() == "local":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "notifications.layers.LocalChannelLayer",
+            "CONFIG": {
+                "socket_dir": os.getenv("CHANNEL_LAYER_SOCKET_DIR") or None,
+            },
         },
-    },
-}
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [("127.0.0.1", 6379)],
+            },
+        },
+    }
+
+# -----------------------------
+# Cache
+# -----------------------------
+# Local memory by default. Version counters behind ETags and cached pages live
+# here, so with more than one process (web workers, SLA scheduler) set
+# CACHE_REDIS_URL (e.g. redis://127.0.0.1:6379/1) to share them
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_REDIS_URL"),
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        },
+    }
+
+# Rendered ticket list pages (tickets/page_cache.py) are invalidated by version
+# on ticket and reference writes; this bounds how long unread pages are kept (0 disables)
+TICKET_PAGE_CACHE_SECONDS = int(os.getenv("TICKET_PAGE_CACHE_SECONDS", "300"))
+# Shared (L2) lifetime of cached User/Branch/Category rows (naita_servicedesk/identity.py);
+# saves and deletes invalidate them, this bounds other processes without CACHE_REDIS_URL
+IDENTITY_CACHE_SECONDS = int(os.getenv("IDENTITY_CACHE_SECONDS", "300"))
+# Browser max-age of branch/division/category responses (naita_servicedesk/reference.py)
+REFERENCE_CACHE_MAX_AGE = int(os.getenv("REFERENCE_CACHE_MAX_AGE", "3600"))
+# In-process lifetime of that rendered data: bounds staleness when workers do
+# not share the cache (see check naita_servicedesk.W001)
+REFERENCE_CACHE_SECONDS = int(os.getenv("REFERENCE_CACHE_SECONDS", "300"))
+
+# -----------------------------
+# Ticket auto-assignment
+# -----------------------------
+TICKET_AUTO_ASSIGN = os.getenv("TICKET_AUTO_ASSIGN", "False").lower() in ("true", "1", "t")
+TICKET_ASSIGNMENT_RESYNC_SECONDS = int(os.getenv("TICKET_ASSIGNMENT_RESYNC_SECONDS", "300"))
+
+# -----------------------------
+# SLA scheduler
+# -----------------------------
+SLA_SCHEDULER_POLL_SECONDS = int(os.getenv("SLA_SCHEDULER_POLL_SECONDS", "30"))
+# Each poll re-reads this much before the last one: a ticket committed late
+# carries an updated_at older than the poll that missed it
+SLA_SCHEDULER_OVERLAP_SECONDS = int(os.getenv("SLA_SCHEDULER_OVERLAP_SECONDS", "300"))
+
+# -----------------------------
+# Near-duplicate ticket detection
+# -----------------------------
+DUPLICATE_WINDOW_HOURS = int(os.getenv("DUPLICATE_WINDOW_HOURS", "72"))
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.5"))
+DUPLICATE_SYNC_SECONDS = int(os.getenv("DUPLICATE_SYNC_SECONDS", "30"))
+DUPLICATE_SYNC_OVERLAP_SECONDS = int(os.getenv("DUPLICATE_SYNC_OVERLAP_SECONDS", "300"))
 
 # -----------------------------
 # Password validation
@@ -148,6 +232,88 @@ MEDIA_URL = "/media/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# -----------------------------
+# Email
+# -----------------------------
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@naita.lk")
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "10"))
+
+# -----------------------------
+# Side-effect resilience (notifications/resilience.py): channel-layer pushes
+# and SMTP sends time out, and after CIRCUIT_BREAKER_FAILURES consecutive
+# failures fail fast for CIRCUIT_BREAKER_RESET_SECONDS before a trial call
+# -----------------------------
+CHANNEL_LAYER_SEND_TIMEOUT = float(os.getenv("CHANNEL_LAYER_SEND_TIMEOUT", "2"))
+CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5"))
+CIRCUIT_BREAKER_RESET_SECONDS = int(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+
+# -----------------------------
+# Prometheus /metrics: only these client addresses (the scraper; behind a
+# reverse proxy, the proxy's) and logged-in staff users may read it
+# -----------------------------
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+
+# -----------------------------
+# Notification coalescing: unread notifications for the same (user, ticket)
+# within this many seconds are merged into one row (0 disables); their
+# immediate emails go out once, with the latest message, when it closes
+# -----------------------------
+NOTIFICATION_COALESCE_SECONDS = int(os.getenv("NOTIFICATION_COALESCE_SECONDS", "300"))
+
+# -----------------------------
+# Notification routing: event -> rules. A rule may be limited to ticket
+# "branches" / "divisions" (by name) and sends to the ticket's "recipients"
+# (creator, assignee), named "users" and "roles" (one broadcast row in-app;
+# "same_branch" limits it to the ticket's branch) over "channels".
+# -----------------------------
+NOTIFICATION_ROUTES = {
+    "ticket_confirmed": [
+        {"recipients": ["creator"], "channels": ["in_app", "email"]},
+    ],
+    "ticket_created": [
+        {"roles": ["ADMIN"], "channels": ["in_app", "email"]},
+    ],
+    "ticket_assigned": [
+        {"recipients": ["assignee"], "channels": ["in_app", "email"]},
+    ],
+    "status_changed": [
+        {"recipients": ["creator"], "channels": ["in_app", "email"]},
+    ],
+    "sla_warning": [
+        {"recipients": ["assignee"], "channels": ["in_app"]},
+        {"roles": ["ADMIN"], "unassigned_only": True, "channels": ["in_app"]},
+    ],
+    "sla_breach": [
+        {"recipients": ["assignee"], "channels": ["in_app"]},
+        {"roles": ["ADMIN"], "channels": ["in_app"]},
+    ],
+}
+NOTIFICATION_ROUTING_RESYNC_SECONDS = int(os.getenv("NOTIFICATION_ROUTING_RESYNC_SECONDS", "300"))
+
+# -----------------------------
+# Notification WebSocket frames: events within the batch window go out as one
+# JSON array; a connection holding more than MAX_PENDING unsent events either
+# drops the oldest ("drop_oldest") or tells the client to refetch ("resync").
+# Acknowledging clients (?ack=1) get at most MAX_IN_FLIGHT unacknowledged
+# frames, so a slow one fills that buffer rather than the socket's
+# -----------------------------
+NOTIFICATION_WS_BATCH_MS = int(os.getenv("NOTIFICATION_WS_BATCH_MS", "100"))
+NOTIFICATION_WS_MAX_PENDING = int(os.getenv("NOTIFICATION_WS_MAX_PENDING", "200"))
+NOTIFICATION_WS_OVERFLOW = os.getenv("NOTIFICATION_WS_OVERFLOW", "resync")
+NOTIFICATION_WS_MAX_IN_FLIGHT = int(os.getenv("NOTIFICATION_WS_MAX_IN_FLIGHT", "4"))
+# Reconnects with ?last_id= replay up to this many missed notifications,
+# beyond that the client is told to resync
+NOTIFICATION_WS_REPLAY_LIMIT = int(os.getenv("NOTIFICATION_WS_REPLAY_LIMIT", "200"))
+# Comment line sent on idle SSE streams so proxies keep them open
+NOTIFICATION_SSE_KEEPALIVE_SECONDS = int(os.getenv("NOTIFICATION_SSE_KEEPALIVE_SECONDS", "25"))
+
+# -----------------------------
+# Notification retention (manage.py prune_notifications)
+# -----------------------------
+NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", "30"))
+NOTIFICATION_RETENTION_UNREAD_DAYS = int(os.getenv("NOTIFICATION_RETENTION_UNREAD_DAYS", "90"))
+NOTIFICATION_ARCHIVE_DIR = os.getenv("NOTIFICATION_ARCHIVE_DIR", str(MEDIA_ROOT / "notification_archive"))
+
 # -----------------------------
 # CORS
 # -----------------------------
@@ -180,6 +346,10 @@ SIMPLE_JWT = {
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
 }
 
+# WebSocket JWT auth reads role/branch from token claims; tokens issued
+# without them fall back to a user lookup cached this many seconds (0 = no cache)
+WEBSOCKET_USER_CACHE_SECONDS = int(os.getenv("WEBSOCKET_USER_CACHE_SECONDS", "60"))
+
 # -----------------------------
 # Custom User Model
 # -----------------------------
@@ -4,13 +4,16 @@ from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from users.views import UserViewSet
-from users.auth_views import CustomTokenObtainPairView
-from rest_framework_simplejwt.views import TokenRefreshView
+from users.auth_views import CustomTokenObtainPairView, CustomTokenRefreshView
 from branches.views import BranchViewSet
-from tickets.views import TicketViewSet
+from tickets.views import TicketViewSet, reference_data
 from notifications.views import NotificationViewSet
+from notifications.stream import notification_stream
+from notifications import async_views as notification_async_views
+from tickets import async_views as ticket_async_views
 from django.shortcuts import redirect
 from staff import views as staff_views
+from naita_servicedesk.views import metrics
 
 # ==========================================================
 # DRF Router Registration
@@ -43,12 +46,24 @@ urlpatterns = [
     # Django Admin
     path("admin/", admin.site.urls),
 
+    # Notification stream (SSE, async; before the router so "stream" is not a pk)
+    path("api/notifications/stream/", notification_stream, name="notification_stream"),
+
+    # Async read endpoints (ASGI)
+    path("api/async/tickets/", ticket_async_views.ticket_list, name="async_ticket_list"),
+    path("api/async/tickets/stats/", ticket_async_views.ticket_stats, name="async_ticket_stats"),
+    path("api/async/tickets/<int:pk>/", ticket_async_views.ticket_detail, name="async_ticket_detail"),
+    path("api/async/notifications/", notification_async_views.notification_list, name="async_notification_list"),
+
     # API Endpoints via DRF Router
     path("api/", include(router.urls)),
 
+    # Branches, divisions and categories in one cacheable response
+    path("api/reference/", reference_data, name="reference_data"),
+
     # JWT Authentication
     path("api/auth/login/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/auth/refresh/", CustomTokenRefreshView.as_view(), name="token_refresh"),
 
     # App-Specific URLs (if you have extra custom views)
     path("api/categories/", include("categories.urls")),
@@ -58,6 +73,9 @@ urlpatterns = [
     
     path("api/reports/", include("reports.urls")),
 
+    # Prometheus metrics (scraper addresses and staff only)
+    path("metrics", metrics, name="prometheus-django-metrics"),
+
     # Root Redirect
     path("", root_redirect, name="root_redirect"),
 ]
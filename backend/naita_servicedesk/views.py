@@ -1,9 +1,22 @@
 
 
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render
+from django_prometheus.exports import ExportToDjangoView
 
 def frontend(request):
     """
     Serves React's index.html for all frontend routes.
     """
     return render(request, "index.html")
+
+
+def metrics(request):
+    """
+    Prometheus metrics (breaker state, request and database stats) for
+    scrapers on METRICS_ALLOWED_IPS and for logged-in staff; 404 for anyone else.
+    """
+    if request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS or request.user.is_staff:
+        return ExportToDjangoView(request)
+    raise Http404
@@ -9,7 +9,7 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from naita_servicedesk.handlers import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'naita_servicedesk.settings')
 
@@ -1,9 +1,21 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, DigestPreference, QueuedEmail
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ("user", "ticket", "message", "read", "created_at")
-    list_filter = ("read", "created_at")
+    list_display = ("user", "audience_role", "audience_branch", "ticket", "message", "read", "created_at")
+    list_filter = ("read", "audience_role", "created_at")
     search_fields = ("message", "user__username", "ticket__title")
+
+
+@admin.register(DigestPreference)
+class DigestPreferenceAdmin(admin.ModelAdmin):
+    list_display = ("user", "mode", "interval_minutes", "last_sent_at")
+    list_filter = ("mode",)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ("user", "subject", "created_at")
+    search_fields = ("subject", "user__username")
@@ -0,0 +1,50 @@
+# notifications/async_views.py
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils.urls import replace_query_param
+
+from naita_servicedesk.conditional import aconditional_response, aqueryset_validator
+from .auth import async_authenticated
+from .models import Notification, BroadcastReceipt
+from .pagination import NotificationCursorPagination
+from .serializers import NotificationSerializer
+
+
+# ----------------------------
+# Notification List
+# ----------------------------
+@require_GET
+@async_authenticated
+async def notification_list(request):
+    """
+    Async variant of the notification feed (ASGI). Pages newest first by id:
+    `?before=<id>` continues after the last row of the previous page, which
+    `next` links to. Includes `unread_count` like the sync list.
+    """
+    user = request.user
+    try:
+        page_size = int(request.GET.get(NotificationCursorPagination.page_size_query_param, ""))
+    except ValueError:
+        page_size = NotificationCursorPagination.page_size
+    page_size = min(max(page_size, 1), NotificationCursorPagination.max_page_size)
+
+    feed = Notification.feed_for(user).select_related("ticket")
+    before = request.GET.get("before", "")
+    if before.isdigit():
+        feed = feed.filter(id__lt=int(before))
+    watermark = await sync_to_async(BroadcastReceipt.get)(user.id)
+
+    async def respond():
+        rows = [n async for n in feed[:page_size + 1]]
+        more, rows = len(rows) > page_size, rows[:page_size]
+        Notification.apply_watermark(rows, watermark)
+        return JsonResponse({
+            "next": replace_query_param(request.build_absolute_uri(), "before", rows[-1].id) if more else None,
+            "results": NotificationSerializer(rows, many=True).data,
+            "unread_count": await sync_to_async(Notification.unread_count)(user),
+        })
+
+    validator = (user.pk, await aqueryset_validator(feed, "ticket__updated_at"), watermark)
+    return await aconditional_response(request, validator, respond)
@@ -0,0 +1,108 @@
+# notifications/auth.py
+
+from functools import wraps
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.tokens import ClaimsUser
+
+
+def _query_token(scope):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    values = query.get("token") or query.get("auth_token")
+    return values[0] if values else None
+
+
+@database_sync_to_async
+def _load_profile(user_id):
+    """role/branch for a token issued before they were claims (cached briefly)."""
+    key = f"ws_user_profile:{user_id}"
+    profile = cache.get(key)
+    if profile is None:
+        profile = (
+            get_user_model().objects.filter(pk=user_id, is_active=True)
+            .values("role", "branch_id")
+            .first()
+        ) or {}
+        if settings.WEBSOCKET_USER_CACHE_SECONDS:
+            cache.set(key, profile, settings.WEBSOCKET_USER_CACHE_SECONDS)
+    return profile
+
+
+async def get_token_user(raw_token):
+    """
+    Validate a SimpleJWT access token from its signature, expiry and token
+    type alone and return a ClaimsUser; AnonymousUser if it is invalid.
+    """
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return AnonymousUser()
+
+    user = ClaimsUser(token)
+    if not user.has_profile_claims:
+        profile = await _load_profile(user.id)
+        if not profile:
+            return AnonymousUser()
+        token["role"] = profile["role"]
+        token["branch_id"] = profile["branch_id"]
+        user = ClaimsUser(token)
+    return user
+
+
+async def authenticate_request(request):
+    """
+    User of an HTTP request for async views: `?token=` or `Authorization:
+    Bearer` JWT (no query), else the session user when sessions run.
+    """
+    raw_token = request.GET.get("token")
+    header = request.headers.get("Authorization", "")
+    if not raw_token and header.startswith("Bearer "):
+        raw_token = header[len("Bearer "):]
+    if raw_token:
+        return await get_token_user(raw_token)
+    if not hasattr(request, "auser"):
+        return AnonymousUser()  # slim API middleware chain: no sessions
+    return await request.auser()
+
+
+def async_authenticated(view):
+    """IsAuthenticated for async views: sets `request.user`, 401 otherwise."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await authenticate_request(request)
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+class JWTAuthMiddleware:
+    """
+    `?token=<access token>` connections are authenticated statelessly, with no
+    session or user query; anything else goes through the session stack.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.session_inner = AuthMiddlewareStack(inner)
+
+    async def __call__(self, scope, receive, send):
+        raw_token = _query_token(scope)
+        if raw_token is None:
+            return await self.session_inner(scope, receive, send)
+        scope = dict(scope, user=await get_token_user(raw_token))
+        return await self.inner(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    return JWTAuthMiddleware(inner)
@@ -1,49 +1,136 @@
+import asyncio
 import json
-from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from collections import OrderedDict
 from urllib.parse import parse_qs
+from django.conf import settings
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from .groups import user_group, audience_groups
+from .stream import notifications_after
+
+DROP_OLDEST = "drop_oldest"
+RESYNC = "resync"
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
-    async def connect(self):
-        # Import here to ensure Django settings are loaded
-        from django.contrib.auth import get_user_model
-        from rest_framework.authtoken.models import Token  # optional
-        User = get_user_model()
+    """
+    Notifications are buffered per connection and sent as one JSON array
+    frame per NOTIFICATION_WS_BATCH_MS window (a notification updated several
+    times in a window is sent once, latest state). While a frame is being
+    written new events keep buffering; past NOTIFICATION_WS_MAX_PENDING the
+    oldest are dropped, or the buffer is replaced by a single
+    {"type": "resync"} frame telling the client to refetch its feed.
+
+    A client connecting with `?ack=1` acknowledges every frame with
+    {"action": "ack"} once it has handled it. At most
+    NOTIFICATION_WS_MAX_IN_FLIGHT frames are then unacknowledged: a slow
+    client makes events wait in the bounded buffer above instead of in the
+    server's socket write buffer, so it overflows into drop/resync too.
+
+    A client reconnecting with `?last_id=<id>` first gets everything newer
+    than that id in one frame (or a resync when it missed too much), then
+    live events.
+    """
 
-        user = await self.get_user_from_scope(User, Token)
+    async def connect(self):
+        # Resolved by JWTAuthMiddleware: a ClaimsUser for ?token= connections
+        # (no database access), else the session user
+        user = self.scope.get("user")
         if user is None or not user.is_authenticated:
             await self.close()
             return
 
         self.user = user
-        self.group_name = f"user_{self.user.id}_notifications"
+        self.group_name = user_group(self.user.id)
+        self.groups_joined = [self.group_name] + audience_groups(self.user.role, self.user.branch_id)
 
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        self.pending = OrderedDict()  # notification id -> latest payload
+        self.resync_required = False
+        self.flush_task = None
+        self.acks = self.query_param("ack") == "1"
+        self.in_flight = 0  # frames sent and not yet acknowledged
+
+        # Join first: events raised during the replay query are not lost
+        # (the client de-duplicates by id)
+        for group in self.groups_joined:
+            await self.channel_layer.group_add(group, self.channel_name)
         await self.accept()
 
+        last_id = self.requested_last_id()
+        if last_id is not None:
+            await self.replay(last_id)
+
     async def disconnect(self, close_code):
-        if hasattr(self, "group_name"):
-            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, "flush_task", None):
+            self.flush_task.cancel()
+        for group in getattr(self, "groups_joined", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    def query_param(self, name):
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        return (query.get(name) or [""])[0]
+
+    def requested_last_id(self):
+        value = self.query_param("last_id")
+        return int(value) if value.isdigit() else None
+
+    async def replay(self, last_id):
+        limit = settings.NOTIFICATION_WS_REPLAY_LIMIT
+        missed = await database_sync_to_async(notifications_after)(self.user, last_id, limit + 1)
+        if len(missed) > limit:
+            await self.send_frame({"type": RESYNC})
+        elif missed:
+            await self.send_frame(missed)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            action = json.loads(text_data or "{}").get("action")
+        except (ValueError, AttributeError):
+            return
+        if action == "ack" and self.in_flight:
+            self.in_flight -= 1
+            if (self.pending or self.resync_required) and self.flush_task is None:
+                self.flush_task = asyncio.ensure_future(self.flush_later())
+
+    # ----------------------------
+    # Frames
+    # ----------------------------
+    def window_full(self):
+        return self.acks and self.in_flight >= settings.NOTIFICATION_WS_MAX_IN_FLIGHT
+
+    async def send_frame(self, data):
+        await self.send(text_data=json.dumps(data))
+        if self.acks:
+            self.in_flight += 1
 
     async def send_notification(self, event):
         payload = event.get("payload", {})
-        await self.send(text_data=json.dumps(payload))
+        self.pending.pop(payload.get("id"), None)
+        self.pending[payload.get("id")] = payload
 
-    @database_sync_to_async
-    def get_user_from_scope(self, User, Token):
-        user = self.scope.get("user")
-        if user and user.is_authenticated:
-            return user
+        if len(self.pending) > settings.NOTIFICATION_WS_MAX_PENDING:
+            if settings.NOTIFICATION_WS_OVERFLOW == DROP_OLDEST:
+                self.pending.popitem(last=False)
+            else:
+                self.pending.clear()
+                self.resync_required = True
 
-        # Optional: token auth
-        query = parse_qs(self.scope.get("query_string").decode())
-        token_vals = query.get("token") or query.get("auth_token")
-        if not token_vals:
-            return None
+        if self.flush_task is None and not self.window_full():
+            self.flush_task = asyncio.ensure_future(self.flush_later())
 
-        token_key = token_vals[0]
+    async def flush_later(self):
         try:
-            token = Token.objects.get(key=token_key)
-            return token.user
-        except Exception:
-            return None
+            await asyncio.sleep(settings.NOTIFICATION_WS_BATCH_MS / 1000)
+            # Events that arrive while a frame is written go out in the next one;
+            # with a full window they wait for the client's next ack
+            while (self.pending or self.resync_required) and not self.window_full():
+                if self.resync_required:
+                    self.resync_required = False
+                    self.pending.clear()
+                    await self.send_frame({"type": RESYNC})
+                else:
+                    batch = list(self.pending.values())
+                    self.pending.clear()
+                    await self.send_frame(batch)
+        finally:
+            self.flush_task = None
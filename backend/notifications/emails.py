@@ -0,0 +1,146 @@
+# notifications/emails.py
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mass_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DigestPreference, QueuedEmail
+from .resilience import smtp_breaker
+
+logger = logging.getLogger(__name__)
+
+
+def _wants_digest(user):
+    """Users without a preference get every email immediately."""
+    if hasattr(user, "wants_digest"):
+        # Cached recipient record (see notifications.recipients)
+        return user.wants_digest
+    try:
+        return user.digest_preference.mode != DigestPreference.IMMEDIATE
+    except DigestPreference.DoesNotExist:
+        return False
+
+
+def _send_each(recipients, subject, message, sent):
+    """One message per recipient (nobody sees the others' addresses) over one SMTP connection."""
+    with get_connection(fail_silently=False) as connection:
+        for recipient in recipients:
+            EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient.email], connection=connection).send()
+            sent.add(recipient.id)
+
+
+def send_or_queue(recipients, subject, message, coalesce=False):
+    """
+    Email `recipients` now or queue the message for the digest of users who
+    chose a digest window. With `coalesce` (the in-app notification was
+    merged into an earlier one) a queued email with the same subject is
+    replaced, not added, and immediate recipients are not emailed per event:
+    their email is held for NOTIFICATION_COALESCE_SECONDS and send_digests
+    delivers the latest message once that window closes.
+
+    Runs once the current transaction commits, so SMTP latency never holds
+    it open and rolled-back changes send nothing. When SMTP fails or its
+    circuit is open the unsent emails are queued too; send_digests delivers
+    them on its next run after SMTP recovers.
+    """
+    recipients = [r for r in recipients if r and r.email]
+    if recipients:
+        transaction.on_commit(lambda: _deliver(recipients, subject, message, coalesce), robust=True)
+
+
+def _deliver(recipients, subject, message, coalesce):
+    immediate = [r for r in recipients if not _wants_digest(r)]
+    queued = [QueuedEmail(user_id=r.id, subject=subject, message=message) for r in recipients if _wants_digest(r)]
+
+    if coalesce and immediate:
+        # Held until the window closes; a later update within it only replaces the message
+        send_after = timezone.now() + timedelta(seconds=settings.NOTIFICATION_COALESCE_SECONDS)
+        queued += [QueuedEmail(user_id=r.id, subject=subject, message=message, send_after=send_after) for r in immediate]
+        immediate = []
+    elif immediate:
+        # Sending the latest message now supersedes any held one
+        QueuedEmail.objects.filter(
+            user_id__in=[r.id for r in immediate], subject=subject, send_after__isnull=False
+        ).delete()
+
+    if queued and coalesce:
+        replaced = set(
+            QueuedEmail.objects.filter(user_id__in=[q.user_id for q in queued], subject=subject)
+            .values_list("user_id", flat=True)
+        )
+        QueuedEmail.objects.filter(user_id__in=replaced, subject=subject).update(message=message)
+        queued = [q for q in queued if q.user_id not in replaced]
+    if queued:
+        QueuedEmail.objects.bulk_create(queued)
+    if immediate:
+        sent = set()
+        try:
+            smtp_breaker.call(_send_each, immediate, subject, message, sent)
+        except Exception as e:
+            logger.warning("Email '%s' deferred: %s", subject, e or type(e).__name__)
+            QueuedEmail.objects.bulk_create(
+                [QueuedEmail(user_id=r.id, subject=subject, message=message) for r in immediate if r.id not in sent]
+            )
+
+
+def render_digest(items):
+    lines = [f"You have {len(items)} service desk update(s):", ""]
+    for item in items:
+        lines.append(f"[{timezone.localtime(item.created_at):%Y-%m-%d %H:%M}] {item.subject}")
+        lines.append(f"    {item.message}")
+    return "\n".join(lines)
+
+
+def send_digests(now=None):
+    """
+    Send one email per recipient whose digest window elapsed, covering all of
+    their queued items (held emails once their `send_after` passed).
+    Returns the number of digests sent.
+    """
+    now = now or timezone.now()
+    ready = QueuedEmail.objects.filter(Q(send_after__isnull=True) | Q(send_after__lte=now), created_at__lte=now)
+    pending_users = ready.values_list("user_id", flat=True).distinct()
+    preferences = {
+        p.user_id: p for p in DigestPreference.objects.filter(user_id__in=pending_users).select_related("user")
+    }
+
+    due = {}
+    for user_id in pending_users:
+        pref = preferences.get(user_id)
+        if pref is None or pref.mode == DigestPreference.IMMEDIATE:
+            # Switched back to immediate: flush what is left right away
+            due[user_id] = None
+            continue
+        window = timedelta(minutes=pref.window_minutes)
+        if not pref.last_sent_at or pref.last_sent_at + window <= now:
+            due[user_id] = pref
+    if not due:
+        return 0
+
+    items = {}
+    for item in ready.filter(user_id__in=due).select_related("user"):
+        items.setdefault(item.user_id, []).append(item)
+
+    messages, sent_ids = [], []
+    for user_id, user_items in items.items():
+        user = user_items[0].user
+        if user.email:
+            subject = user_items[0].subject if len(user_items) == 1 else f"Service desk digest: {len(user_items)} updates"
+            messages.append((subject, render_digest(user_items), settings.DEFAULT_FROM_EMAIL, [user.email]))
+        sent_ids += [i.id for i in user_items]
+
+    # One SMTP connection for the whole run; on failure everything stays queued
+    try:
+        smtp_breaker.call(send_mass_mail, messages, fail_silently=False)
+    except Exception as e:
+        logger.warning("Email digests deferred: %s", e or type(e).__name__)
+        return 0
+    QueuedEmail.objects.filter(id__in=sent_ids).delete()
+    DigestPreference.objects.filter(user_id__in=[u for u, p in due.items() if p]).update(last_sent_at=now)
+    logger.info("Sent %d email digest(s)", len(messages))
+    return len(messages)
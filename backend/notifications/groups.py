@@ -0,0 +1,22 @@
+# notifications/groups.py
+#
+# Channel-layer group names shared by the signal handlers and the consumer.
+
+
+def user_group(user_id):
+    """Personal notifications of one user."""
+    return f"user_{user_id}_notifications"
+
+
+def broadcast_group(role="", branch_id=None):
+    """Broadcasts addressed to a role (empty = everyone), optionally in one branch."""
+    name = f"broadcast_{(role or 'all').lower()}"
+    return f"{name}_branch_{branch_id}" if branch_id else name
+
+
+def audience_groups(role, branch_id=None):
+    """Every broadcast group a user with this role and branch listens to."""
+    groups = [broadcast_group(), broadcast_group(role)]
+    if branch_id:
+        groups += [broadcast_group(branch_id=branch_id), broadcast_group(role, branch_id)]
+    return groups
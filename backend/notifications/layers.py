@@ -0,0 +1,291 @@
+# notifications/layers.py
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import string
+import threading
+import time
+from collections import deque
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+logger = logging.getLogger(__name__)
+
+MAX_DATAGRAM = 256 * 1024
+_NODE_RE = re.compile(r"^\d+-[0-9a-f]{8}$")
+
+
+class _Channel:
+    __slots__ = ("queue", "waiters")
+
+    def __init__(self):
+        self.queue = deque()    # (expires_at, message)
+        self.waiters = deque()  # futures of pending receive() calls
+
+
+# ======================================================
+# Local Channel Layer
+# ======================================================
+class LocalChannelLayer(BaseChannelLayer):
+    """
+    Channel layer kept in this process's memory, for single-node installs:
+    no Redis round trip and no serialization on the local path (messages are
+    shallow-copied per recipient). Supports groups with expiry, per-channel
+    capacity (ChannelFull) and message expiry like the Redis layer. Safe to
+    call from any thread or event loop (e.g. async_to_sync in signals).
+
+    With `socket_dir` set, other processes on the host are reached over Unix
+    datagram sockets in that directory: every process that receives binds
+    one socket there; group_send is fanned out to all of them (JSON encoded)
+    and send() to a channel created in another process goes to its owner.
+    Sockets of processes that died are removed on the first failed send.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None, socket_dir=None, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.group_expiry = group_expiry
+        self.socket_dir = socket_dir
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.node = f"{self._pid}-{secrets.token_hex(4)}"
+        self._channels = {}     # channel name -> _Channel
+        self._groups = {}       # group -> {channel name: joined_at}
+        self._socket = None     # bound socket receiving fan-out (lazy)
+        self._sender = None
+
+    def _check_fork(self):
+        # A layer inherited through fork() must not share the parent's node name or socket
+        if self._pid != os.getpid():
+            self._reset()
+
+    # ----------------------------
+    # Channel layer API
+    # ----------------------------
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        self._check_fork()
+        node = self._node_of(channel)
+        if node and node != self.node:
+            self._send_to(self._socket_path(node), {"channel": channel, "message": message})
+            return
+        self._deliver(channel, dict(message))
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        self._check_fork()
+        self._listen()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._channels.setdefault(channel, _Channel())
+            self._expire(channel, state)
+            if state.queue:
+                message = state.queue.popleft()[1]
+                self._drop_if_idle(channel, state)
+                return message
+            future = loop.create_future()
+            state.waiters.append(future)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Cancelled right after a message was handed over: don't lose it
+                self._resolve(channel, future, future.result())
+            raise
+        finally:
+            with self._lock:
+                if future in state.waiters:
+                    state.waiters.remove(future)
+                self._drop_if_idle(channel, state)
+
+    async def new_channel(self, prefix="specific."):
+        self._check_fork()
+        self._listen()
+        suffix = "".join(secrets.choice(string.ascii_letters) for _ in range(12))
+        return f"{prefix}{self.node}!{suffix}"
+
+    # ----------------------------
+    # Groups extension
+    # ----------------------------
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self._check_fork()
+        self._listen()
+        with self._lock:
+            self._groups.setdefault(group, {})[channel] = time.time()
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        with self._lock:
+            members = self._groups.get(group)
+            if members:
+                members.pop(channel, None)
+                if not members:
+                    del self._groups[group]
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_group_name(group)
+        self._check_fork()
+        self._send_group_local(group, message)
+        if self.socket_dir:
+            self._fan_out({"group": group, "message": message})
+
+    # ----------------------------
+    # Flush extension
+    # ----------------------------
+    async def flush(self):
+        with self._lock:
+            self._channels = {}
+            self._groups = {}
+
+    async def close(self):
+        pass
+
+    # ----------------------------
+    # Local delivery
+    # ----------------------------
+    def _deliver(self, channel, message):
+        with self._lock:
+            state = self._channels.setdefault(channel, _Channel())
+            self._expire(channel, state)
+            while state.waiters:
+                future = state.waiters.popleft()
+                if not future.done():
+                    future.get_loop().call_soon_threadsafe(self._resolve, channel, future, message)
+                    return
+            if len(state.queue) >= self.get_capacity(channel):
+                raise ChannelFull(channel)
+            state.queue.append((time.monotonic() + self.expiry, message))
+
+    def _resolve(self, channel, future, message):
+        if future.done():
+            # Receiver was cancelled in the meantime: keep the message for the next one
+            try:
+                self._deliver(channel, message)
+            except ChannelFull:
+                pass
+        else:
+            future.set_result(message)
+
+    def _send_group_local(self, group, message):
+        with self._lock:
+            members = self._groups.get(group, {})
+            cutoff = time.time() - self.group_expiry
+            for channel, joined_at in list(members.items()):
+                if joined_at < cutoff:
+                    del members[channel]
+            channels = list(members)
+        for channel in channels:
+            try:
+                self._deliver(channel, dict(message))
+            except ChannelFull:
+                pass
+
+    def _expire(self, channel, state):
+        """Drop expired messages; like the Redis layer, that also ends group memberships."""
+        now = time.monotonic()
+        expired = False
+        while state.queue and state.queue[0][0] < now:
+            state.queue.popleft()
+            expired = True
+        if expired:
+            for members in self._groups.values():
+                members.pop(channel, None)
+
+    def _drop_if_idle(self, channel, state):
+        if not state.queue and not state.waiters and self._channels.get(channel) is state:
+            del self._channels[channel]
+
+    # ----------------------------
+    # Cross-process fan-out
+    # ----------------------------
+    def _socket_path(self, node):
+        return os.path.join(self.socket_dir, f"{node}.sock")
+
+    def _node_of(self, channel):
+        if not self.socket_dir or "!" not in channel:
+            return None
+        node = channel.split("!", 1)[0].rsplit(".", 1)[-1]
+        return node if _NODE_RE.match(node) else None
+
+    def _listen(self):
+        """Bind this process's socket the first time it has something to receive."""
+        if not self.socket_dir or self._socket is not None:
+            return
+        with self._lock:
+            if self._socket is not None:
+                return
+            os.makedirs(self.socket_dir, exist_ok=True)
+            path = self._socket_path(self.node)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MAX_DATAGRAM * 4)
+            sock.bind(path)
+            self._socket = sock
+        atexit.register(self._unlink, path)
+        threading.Thread(target=self._read, args=(sock,), name="channel-layer-fanout", daemon=True).start()
+
+    def _read(self, sock):
+        while True:
+            try:
+                packet = json.loads(sock.recv(MAX_DATAGRAM))
+            except OSError:
+                return
+            except ValueError:
+                continue
+            if "group" in packet:
+                self._send_group_local(packet["group"], packet["message"])
+            else:
+                try:
+                    self._deliver(packet["channel"], packet["message"])
+                except ChannelFull:
+                    pass
+
+    def _fan_out(self, packet):
+        own = f"{self.node}.sock"
+        try:
+            names = [n for n in os.listdir(self.socket_dir) if n.endswith(".sock") and n != own]
+        except FileNotFoundError:
+            return
+        if names:
+            data = json.dumps(packet).encode()
+            for name in names:
+                self._send_to(os.path.join(self.socket_dir, name), data)
+
+    def _send_to(self, path, data):
+        if isinstance(data, dict):
+            data = json.dumps(data).encode()
+        if self._sender is None:
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+        try:
+            self._sender.sendto(data, path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Owner process is gone
+            self._unlink(path)
+        except BlockingIOError:
+            logger.warning("Channel layer fan-out to %s dropped a message (receiver busy)", path)
+        except OSError as e:
+            logger.warning("Channel layer fan-out to %s failed: %s", path, e)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.emails import send_digests
+
+
+class Command(BaseCommand):
+    help = "Send one digest email per recipient whose digest window has elapsed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=int, default=0,
+                            help="Keep running, checking every N seconds (default: run once, e.g. from cron)")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_digests()
+            self.stdout.write(f"Sent {sent} digest(s).")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0002_alter_branch_name'),
+        ('notifications', '0002_unread_counter'),
+        ('tickets', '0023_ticket_filter_indexes'),
+        ('users', '0006_user_divisions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='broadcast_receipt', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_read_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='audience_branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='branches.branch'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='audience_role',
+            field=models.CharField(blank=True, default='', help_text='Empty means all roles', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['audience_role', '-id'], name='notif_broadcast_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digestpreference',
+            name='email_enabled',
+            field=models.BooleanField(default=True, help_text='Receive notification emails at all'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_digest_email_enabled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='send_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,18 +1,224 @@
 from django.db import models
+from django.db.models import F, Q, Max
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+from branches.models import Branch
 from tickets.models import Ticket
 
 User = settings.AUTH_USER_MODEL
 
 class Notification(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    """
+    Personal notification (`user` set) or broadcast (`user` empty): a broadcast
+    is stored once for an audience of role and/or branch, and its read state
+    comes from each user's BroadcastReceipt watermark.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications", null=True, blank=True)
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="notifications")
     message = models.TextField()
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Broadcast audience (only used when user is empty)
+    audience_role = models.CharField(max_length=20, blank=True, default="", help_text="Empty means all roles")
+    audience_branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="notif_user_feed_idx"),
+            models.Index(fields=["user", "read"], name="notif_user_read_idx"),
+            models.Index(fields=["audience_role", "-id"], name="notif_broadcast_idx"),
+        ]
 
     def __str__(self):
+        if self.user_id is None:
+            return f"Broadcast to {self.audience_role or 'all'} - {self.ticket.title}"
         return f"Notification for {self.user} - {self.ticket.title}"
+
+    @property
+    def is_broadcast(self):
+        return self.user_id is None
+
+    @staticmethod
+    def apply_watermark(notifications, watermark):
+        """Set `read` of broadcasts from the reader's BroadcastReceipt watermark."""
+        for notification in notifications:
+            if notification.is_broadcast:
+                notification.read = notification.id <= watermark
+        return notifications
+
+    @classmethod
+    def notify(cls, user, ticket, message):
+        """
+        Personal notification with coalescing: an unread notification for the
+        same (user, ticket) created within NOTIFICATION_COALESCE_SECONDS is
+        updated to the latest message instead of adding a row.
+        `user` may be a user or a user id. Returns (notification, created).
+        """
+        user_id = getattr(user, "pk", user)
+        window = settings.NOTIFICATION_COALESCE_SECONDS
+        if window:
+            existing = (
+                cls.objects.filter(
+                    user_id=user_id, ticket=ticket, read=False,
+                    created_at__gte=timezone.now() - timedelta(seconds=window),
+                )
+                .order_by("-id")
+                .first()
+            )
+            if existing:
+                existing.message = message
+                existing.save(update_fields=["message", "updated_at"])
+                return existing, False
+        return cls.objects.create(user_id=user_id, ticket=ticket, message=message), True
+
+    @classmethod
+    def broadcast(cls, ticket, message, role="", branch_id=None):
+        """Single row for the whole audience, whatever its size."""
+        return cls.objects.create(
+            ticket=ticket, message=message, audience_role=(role or "").upper(), audience_branch_id=branch_id
+        )
+
+    @staticmethod
+    def audience_q(user):
+        """Broadcasts addressed to this user."""
+        role = (getattr(user, "role", "") or "").upper()
+        return (
+            Q(user__isnull=True)
+            & Q(audience_role__in=["", role])
+            & (Q(audience_branch__isnull=True) | Q(audience_branch_id=user.branch_id))
+        )
+
+    @classmethod
+    def feed_for(cls, user):
+        """Personal notifications merged with the user's broadcasts, newest first."""
+        return cls.objects.filter(Q(user_id=user.pk) | cls.audience_q(user)).order_by("-id")
+
+    @classmethod
+    def unread_count(cls, user):
+        watermark = BroadcastReceipt.get(user.id)
+        broadcasts = cls.objects.filter(cls.audience_q(user), id__gt=watermark).count()
+        return UnreadCounter.get(user.id) + broadcasts
+
+
+class UnreadCounter(models.Model):
+    """
+    Per-user unread notification count, so the bell badge is a primary key
+    lookup instead of a COUNT over the notification table.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="unread_counter")
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count} unread"
+
+    @classmethod
+    def get(cls, user_id):
+        count = cls.objects.filter(user_id=user_id).values_list("count", flat=True).first()
+        if count is None:
+            count = cls._rebuild(user_id)
+        return count
+
+    @classmethod
+    def add(cls, user_id, delta):
+        """Apply a +/- change; a missing row is rebuilt from the table (already reflecting it)."""
+        updated = cls.objects.filter(user_id=user_id).update(count=Greatest(F("count") + delta, 0))
+        if not updated:
+            cls._rebuild(user_id)
+
+    @classmethod
+    def subtract(cls, user_id, count):
+        """
+        Decrement without rebuilding: safe while the user is being deleted,
+        and a missing row is rebuilt by the next get() anyway.
+        """
+        cls.objects.filter(user_id=user_id).update(count=Greatest(F("count") - count, 0))
+
+    @classmethod
+    def reset(cls, user_id):
+        cls.objects.update_or_create(user_id=user_id, defaults={"count": 0})
+
+    @classmethod
+    def _rebuild(cls, user_id):
+        count = Notification.objects.filter(user_id=user_id, read=False).count()
+        cls.objects.update_or_create(user_id=user_id, defaults={"count": count})
+        return count
+
+
+class DigestPreference(models.Model):
+    """How a user wants notification emails delivered."""
+    IMMEDIATE = "IMMEDIATE"
+    INTERVAL = "INTERVAL"
+    HOURLY = "HOURLY"
+    MODE_CHOICES = [
+        (IMMEDIATE, "Immediately"),
+        (INTERVAL, "Every N minutes"),
+        (HOURLY, "Hourly"),
+    ]
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="digest_preference")
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=IMMEDIATE)
+    interval_minutes = models.PositiveIntegerField(default=15, help_text="Window length for 'Every N minutes'")
+    last_sent_at = models.DateTimeField(null=True, blank=True)
+    email_enabled = models.BooleanField(default=True, help_text="Receive notification emails at all")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.get_mode_display()}"
+
+    @property
+    def window_minutes(self):
+        if self.mode == self.HOURLY:
+            return 60
+        if self.mode == self.INTERVAL:
+            return max(self.interval_minutes, 1)
+        return 0
+
+
+class QueuedEmail(models.Model):
+    """
+    Notification email waiting for the recipient's next digest, or, with
+    `send_after`, an immediate email held until its coalescing window closes.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="queued_emails")
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.subject}"
+
+
+class BroadcastReceipt(models.Model):
+    """Per-user read watermark: broadcasts with id <= last_read_id are read."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="broadcast_receipt")
+    last_read_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: read up to #{self.last_read_id}"
+
+    @classmethod
+    def get(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list("last_read_id", flat=True).first() or 0
+
+    @classmethod
+    def advance(cls, user_id, notification_id):
+        """Move the watermark forward (never back)."""
+        if not notification_id:
+            return
+        updated = cls.objects.filter(user_id=user_id).update(
+            last_read_id=Greatest(F("last_read_id"), notification_id)
+        )
+        if not updated:
+            cls.objects.get_or_create(user_id=user_id, defaults={"last_read_id": notification_id})
+
+    @classmethod
+    def advance_to_latest(cls, user_id):
+        cls.advance(user_id, Notification.objects.filter(user__isnull=True).aggregate(m=Max("id"))["m"])
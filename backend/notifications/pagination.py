@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Newest-first cursor feed over the (user, -id) index: each page is a
+    bounded index range scan no matter how deep the user scrolls.
+    """
+    ordering = "-id"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
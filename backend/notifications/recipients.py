@@ -0,0 +1,216 @@
+# notifications/recipients.py
+
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+
+from branches.models import Branch
+from tickets.models import Division
+from .models import Notification, DigestPreference
+from .emails import send_or_queue
+
+User = get_user_model()
+
+# Ticket events (keys of settings.NOTIFICATION_ROUTES)
+TICKET_CONFIRMED = "ticket_confirmed"
+TICKET_CREATED = "ticket_created"
+TICKET_ASSIGNED = "ticket_assigned"
+STATUS_CHANGED = "status_changed"
+SLA_WARNING = "sla_warning"
+SLA_BREACH = "sla_breach"
+
+IN_APP = "in_app"
+EMAIL = "email"
+CHANNELS = {IN_APP, EMAIL}
+TICKET_RECIPIENTS = {"creator", "assignee"}
+RULE_KEYS = {"recipients", "roles", "users", "branches", "divisions", "same_branch", "unassigned_only", "channels"}
+
+Recipient = namedtuple("Recipient", "id username email role branch_id wants_digest email_enabled")
+Delivery = namedtuple("Delivery", "in_app broadcasts email")
+
+_Rule = namedtuple(
+    "_Rule", "branch_ids division_ids recipients user_ids roles same_branch unassigned_only channels"
+)
+
+
+# ======================================================
+# Recipient Index
+# ======================================================
+class RecipientIndex:
+    """
+    NOTIFICATION_ROUTES compiled against the user table.
+
+    Branch/division names and usernames in the routing table are resolved to
+    ids once, and active users are grouped by (role, branch) so resolving an
+    event's recipients only reads these maps. Role audiences are delivered
+    in-app as a single broadcast row and by email to the cached members.
+
+    The index is recompiled when users, preferences, branches or divisions
+    change in this process, and every NOTIFICATION_ROUTING_RESYNC_SECONDS
+    to pick up changes made by other processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users = {}        # user_id -> Recipient
+        self._members = {}      # (role, branch_id or None) -> (user_id, ...)
+        self._rules = {}        # event -> [_Rule, ...]
+        self._compiled_at = None
+        self._dirty = True
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def resolve(self, event, ticket):
+        """
+        Recipients of `event` for `ticket`: a Delivery of personal in-app
+        recipients, (role, branch_id) broadcast audiences and email recipients.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            in_app, broadcasts, email = {}, [], {}
+            for rule in self._rules.get(event, ()):
+                if rule.branch_ids is not None and ticket.branch_id not in rule.branch_ids:
+                    continue
+                if rule.division_ids is not None and ticket.division_id not in rule.division_ids:
+                    continue
+                if rule.unassigned_only and ticket.assigned_to_id:
+                    continue
+
+                user_ids = list(rule.user_ids)
+                if "creator" in rule.recipients:
+                    user_ids.append(ticket.created_by_id)
+                if "assignee" in rule.recipients:
+                    user_ids.append(ticket.assigned_to_id)
+
+                audience_branch = ticket.branch_id if rule.same_branch else None
+                if IN_APP in rule.channels:
+                    for user_id in filter(None, user_ids):
+                        in_app[user_id] = self._users.get(user_id) or _unknown(user_id)
+                    broadcasts += [(role, audience_branch) for role in rule.roles]
+                if EMAIL in rule.channels:
+                    for role in rule.roles:
+                        user_ids += self._members.get((role, audience_branch), ())
+                    for user_id in user_ids:
+                        recipient = self._users.get(user_id)
+                        if recipient and recipient.email and recipient.email_enabled:
+                            email[user_id] = recipient
+
+            return Delivery(list(in_app.values()), list(dict.fromkeys(broadcasts)), list(email.values()))
+
+    def invalidate(self):
+        """Force a recompile on next use."""
+        with self._lock:
+            self._dirty = True
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _ensure_fresh(self):
+        if (
+            self._dirty
+            or self._compiled_at is None
+            or time.monotonic() - self._compiled_at > settings.NOTIFICATION_ROUTING_RESYNC_SECONDS
+        ):
+            self._compile()
+
+    def _compile(self):
+        users, members = {}, {}
+        for user in User.objects.filter(is_active=True).select_related("digest_preference"):
+            try:
+                preference = user.digest_preference
+            except DigestPreference.DoesNotExist:
+                preference = None
+            role = (user.role or "").upper()
+            users[user.id] = Recipient(
+                user.id,
+                user.username,
+                user.email,
+                role,
+                user.branch_id,
+                bool(preference and preference.mode != DigestPreference.IMMEDIATE),
+                preference.email_enabled if preference else True,
+            )
+            members.setdefault((role, None), []).append(user.id)
+            if user.branch_id:
+                members.setdefault((role, user.branch_id), []).append(user.id)
+
+        lookups = {
+            "branches": dict(Branch.objects.values_list("name", "id")),
+            "divisions": dict(Division.objects.values_list("name", "id")),
+            "users": {r.username: r.id for r in users.values()},
+        }
+        rules = {
+            event: [self._compile_rule(event, rule, lookups) for rule in event_rules]
+            for event, event_rules in settings.NOTIFICATION_ROUTES.items()
+        }
+
+        self._users = users
+        self._members = {key: tuple(ids) for key, ids in members.items()}
+        self._rules = rules
+        self._compiled_at = time.monotonic()
+        self._dirty = False
+
+    @staticmethod
+    def _compile_rule(event, rule, lookups):
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ImproperlyConfigured(f"NOTIFICATION_ROUTES[{event!r}]: unknown key(s) {sorted(unknown)}")
+        recipients = set(rule.get("recipients", ()))
+        if recipients - TICKET_RECIPIENTS:
+            raise ImproperlyConfigured(
+                f"NOTIFICATION_ROUTES[{event!r}]: recipients must be among {sorted(TICKET_RECIPIENTS)}"
+            )
+        channels = frozenset(rule.get("channels", (IN_APP,)))
+        if channels - CHANNELS:
+            raise ImproperlyConfigured(f"NOTIFICATION_ROUTES[{event!r}]: channels must be among {sorted(CHANNELS)}")
+
+        def ids(key):
+            # Names that no longer exist match nothing rather than everything
+            if key not in rule:
+                return None
+            return frozenset(lookups[key][name] for name in rule[key] if name in lookups[key])
+
+        return _Rule(
+            branch_ids=ids("branches"),
+            division_ids=ids("divisions"),
+            recipients=frozenset(recipients),
+            user_ids=tuple(ids("users") or ()),
+            roles=tuple(role.upper() for role in rule.get("roles", ())),
+            same_branch=bool(rule.get("same_branch")),
+            unassigned_only=bool(rule.get("unassigned_only")),
+            channels=channels,
+        )
+
+
+def _unknown(user_id):
+    """Placeholder for a user created after the last compile: in-app only."""
+    return Recipient(user_id, "", "", "", None, False, False)
+
+
+# Process-wide index used by signals and the SLA scheduler
+recipient_index = RecipientIndex()
+
+
+def deliver(event, ticket, message, subject=None):
+    """Notify everyone `event` routes to for `ticket`, in-app and by email."""
+    delivery = recipient_index.resolve(event, ticket)
+
+    merged = set()
+    for recipient in delivery.in_app:
+        _, created = Notification.notify(recipient.id, ticket, message)
+        if not created:
+            merged.add(recipient.id)
+    for role, branch_id in delivery.broadcasts:
+        Notification.broadcast(ticket, message, role=role, branch_id=branch_id)
+
+    if delivery.email:
+        subject = subject or f"Ticket Update: #{ticket.id}"
+        # Recipients whose in-app row was merged also get their queued email replaced
+        send_or_queue([r for r in delivery.email if r.id not in merged], subject, message)
+        send_or_queue([r for r in delivery.email if r.id in merged], subject, message, coalesce=True)
+    return delivery
@@ -0,0 +1,180 @@
+# notifications/resilience.py
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+circuit_state = Gauge(
+    "servicedesk_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ["dependency"]
+)
+circuit_calls = Counter(
+    "servicedesk_circuit_calls_total", "Calls through a circuit breaker by outcome", ["dependency", "outcome"]
+)
+deferred_calls = Gauge(
+    "servicedesk_circuit_deferred", "Calls waiting for a retry", ["dependency"]
+)
+
+
+class CircuitOpen(Exception):
+    """The dependency is failing; the call was not attempted."""
+
+
+# ======================================================
+# Circuit Breaker
+# ======================================================
+class CircuitBreaker:
+    """
+    Fails fast once a dependency is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls raise CircuitOpen without touching the dependency. After
+    `reset_seconds` one trial call is let through (half-open): success
+    closes the circuit, failure opens it again.
+
+    Calls that should not be lost can be `defer()`-ed: they are kept (up to
+    `max_deferred`, oldest dropped first) and replayed once the dependency
+    answers again.
+    """
+
+    def __init__(self, name, failure_threshold=None, reset_seconds=None, max_deferred=1000):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURES
+        self.reset_seconds = reset_seconds or settings.CIRCUIT_BREAKER_RESET_SECONDS
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._deferred = deque(maxlen=max_deferred)
+        self._retry_timer = None
+        circuit_state.labels(name).set(CLOSED)
+        deferred_calls.labels(name).set(0)
+
+    @property
+    def state(self):
+        return self._state
+
+    def call(self, func, *args, **kwargs):
+        if not self._allow():
+            circuit_calls.labels(self.name, "rejected").inc()
+            raise CircuitOpen(f"{self.name} circuit is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            circuit_calls.labels(self.name, "failure").inc()
+            self._on_failure()
+            raise
+        circuit_calls.labels(self.name, "success").inc()
+        self._on_success()
+        return result
+
+    def defer(self, func, *args, **kwargs):
+        """Retry `func` once the dependency is healthy again."""
+        with self._lock:
+            self._deferred.append((func, args, kwargs))
+            deferred_calls.labels(self.name).set(len(self._deferred))
+        self._schedule_retry()
+
+    # ----------------------------
+    # State machine
+    # ----------------------------
+    def _allow(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+                return True
+            return False
+
+    def _on_success(self):
+        with self._lock:
+            self._failures = 0
+            recovered = self._state != CLOSED
+            if recovered:
+                self._set_state(CLOSED)
+        if recovered:
+            logger.info("Circuit %s closed", self.name)
+            self._schedule_retry(delay=0)
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("Circuit %s opened after %d failure(s)", self.name, self._failures)
+                self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+
+    def _set_state(self, state):
+        self._state = state
+        circuit_state.labels(self.name).set(state)
+
+    # ----------------------------
+    # Deferred retry
+    # ----------------------------
+    def _schedule_retry(self, delay=None):
+        with self._lock:
+            if not self._deferred or self._retry_timer is not None:
+                return
+            self._retry_timer = threading.Timer(
+                self.reset_seconds if delay is None else delay, self._retry_deferred
+            )
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _retry_deferred(self):
+        with self._lock:
+            self._retry_timer = None
+        while True:
+            with self._lock:
+                if not self._deferred:
+                    break
+                func, args, kwargs = self._deferred.popleft()
+                deferred_calls.labels(self.name).set(len(self._deferred))
+            try:
+                self.call(func, *args, **kwargs)
+                circuit_calls.labels(self.name, "retried").inc()
+            except Exception:
+                with self._lock:
+                    self._deferred.appendleft((func, args, kwargs))
+                    deferred_calls.labels(self.name).set(len(self._deferred))
+                break
+        self._schedule_retry()
+
+
+channel_layer_breaker = CircuitBreaker("channel_layer")
+smtp_breaker = CircuitBreaker("smtp")
+
+
+# -----------------------------
+# Guarded side effects
+# -----------------------------
+def _group_send(group, message):
+    async def send():
+        await asyncio.wait_for(
+            get_channel_layer().group_send(group, message), settings.CHANNEL_LAYER_SEND_TIMEOUT
+        )
+    async_to_sync(send)()
+
+
+def group_send(group, message):
+    """
+    group_send with a timeout behind the channel-layer breaker. Never raises:
+    a failed or rejected push is deferred and retried when the layer recovers.
+    """
+    try:
+        channel_layer_breaker.call(_group_send, group, message)
+    except Exception as e:
+        logger.warning("Deferred push to %s: %s", group, e or type(e).__name__)
+        channel_layer_breaker.defer(_group_send, group, message)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, DigestPreference
 
 class NotificationSerializer(serializers.ModelSerializer):
     ticket_title = serializers.CharField(source="ticket.title", read_only=True)
@@ -7,4 +7,15 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ["id", "ticket", "ticket_title", "ticket_status", "message", "read", "created_at"]
+        fields = ["id", "ticket", "ticket_title", "ticket_status", "message", "read", "created_at", "updated_at"]
+
+
+class DigestPreferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DigestPreference
+        fields = ["mode", "interval_minutes", "email_enabled", "last_sent_at"]
+        read_only_fields = ["last_sent_at"]
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
@@ -1,33 +1,130 @@
-from django.db.models.signals import post_save
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from .models import Notification
+from branches.models import Branch
+from tickets.models import Division
+from .models import Notification, UnreadCounter, DigestPreference
 from .serializers import NotificationSerializer
+from .groups import user_group, broadcast_group
+from .recipients import recipient_index
+from .resilience import group_send
 
-channel_layer = get_channel_layer()
+_pending = threading.local()
+_explicit_counts = threading.local()
 
 @receiver(post_save, sender=Notification)
-def broadcast_notification(sender, instance, created, **kwargs):
-    if not created:
+def broadcast_notification(sender, instance, created, update_fields=None, **kwargs):
+    """Push new and coalesced notifications (see Notification.notify)."""
+    if not created and "message" not in (update_fields or ()):
         return
+    schedule_push(instance)
+
+
+def schedule_push(instance):
+    """
+    Outside a transaction push right away. Inside one, keep only the latest
+    state per notification and push once on commit, so an event that updates
+    the same coalesced row several times sends a single WebSocket message.
+    """
+    if not connection.in_atomic_block:
+        push_notification(instance)
+        return
+
+    pending = getattr(_pending, "items", None)
+    registered = pending is not None and any(entry[1] is _flush_pending for entry in connection.run_on_commit)
+    if not registered:
+        # First push in this transaction (or the last one rolled back)
+        pending = _pending.items = {}
+        transaction.on_commit(_flush_pending)
+    pending[instance.id] = instance
+
+
+def _flush_pending():
+    items, _pending.items = getattr(_pending, "items", None) or {}, None
+    for instance in items.values():
+        push_notification(instance)
+
+
+def notification_payload(instance):
     # Build payload (keep small)
+    return {
+        "id": instance.id,
+        "ticket": instance.ticket.id,
+        "ticket_title": instance.ticket.title,
+        "ticket_status": instance.ticket.status,
+        "message": instance.message,
+        "read": instance.read,
+        "created_at": instance.created_at.isoformat(),
+        "updated_at": instance.updated_at.isoformat(),
+    }
+
+
+def push_notification(instance):
     try:
-        payload = {
-            "id": instance.id,
-            "ticket": instance.ticket.id,
-            "ticket_title": instance.ticket.title,
-            "ticket_status": instance.ticket.status,
-            "message": instance.message,
-            "read": instance.read,
-            "created_at": instance.created_at.isoformat(),
-        }
-        group_name = f"user_{instance.user.id}_notifications"
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {"type": "send_notification", "payload": payload},
-        )
+        payload = notification_payload(instance)
+        if instance.is_broadcast:
+            group_name = broadcast_group(instance.audience_role, instance.audience_branch_id)
+        else:
+            group_name = user_group(instance.user_id)
+        # Timeout + circuit breaker; deferred for retry if the layer is down
+        group_send(group_name, {"type": "send_notification", "payload": payload})
     except Exception as e:
         # Log error, don't crash
         import logging
         logging.exception("Failed to broadcast notification: %s", e)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_on_create(sender, instance, created, **kwargs):
+    if created and not instance.read and not instance.is_broadcast:
+        UnreadCounter.add(instance.user_id, 1)
+
+
+@receiver(post_delete, sender=Notification)
+def count_unread_on_delete(sender, instance, **kwargs):
+    """Single deletes and cascades (ticket or user deleted) alike."""
+    if getattr(_explicit_counts, "active", False):
+        return
+    if not instance.read and not instance.is_broadcast:
+        UnreadCounter.subtract(instance.user_id, 1)
+
+
+@contextmanager
+def explicit_unread_counts():
+    """Deletes in this block adjust UnreadCounter themselves (see prune_notifications)."""
+    _explicit_counts.active = True
+    try:
+        yield
+    finally:
+        _explicit_counts.active = False
+
+
+def push_created(notifications):
+    """
+    Counterpart of the post_save handlers for rows inserted with bulk_create:
+    bump unread counters once per user and broadcast each notification.
+    """
+    for user_id, count in Counter(n.user_id for n in notifications if not n.read and n.user_id).items():
+        UnreadCounter.add(user_id, count)
+    for notification in notifications:
+        broadcast_notification(Notification, notification, created=True)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+@receiver(post_save, sender=DigestPreference)
+@receiver(post_delete, sender=DigestPreference)
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+@receiver(post_save, sender=Division)
+@receiver(post_delete, sender=Division)
+def invalidate_recipient_index(sender, update_fields=None, **kwargs):
+    """Users, roles, preferences or routed branches/divisions changed: recompile lazily."""
+    if update_fields and set(update_fields) <= {"last_login", "last_sent_at"}:
+        # Logins and digest bookkeeping do not change who gets what
+        return
+    recipient_index.invalidate()
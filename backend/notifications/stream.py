@@ -0,0 +1,90 @@
+# notifications/stream.py
+
+import asyncio
+import json
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .auth import authenticate_request
+from .groups import user_group, audience_groups
+from .models import Notification, BroadcastReceipt
+from .signals import notification_payload
+
+
+def notifications_after(user, last_id, limit):
+    """Oldest-first payloads newer than `last_id` (walks the feed indexes by id)."""
+    rows = (
+        Notification.feed_for(user)
+        .filter(id__gt=last_id)
+        .select_related("ticket")
+        .order_by("id")[:limit]
+    )
+    # Broadcasts read in the meantime must not come back unread
+    rows = Notification.apply_watermark(list(rows), BroadcastReceipt.get(user.id))
+    return [notification_payload(n) for n in rows]
+
+
+def _event(name, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {name}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events transport for networks that block WebSockets.
+
+    Streams the same payloads as NotificationConsumer from the same channel
+    groups, one `notification` event per payload with the notification id as
+    event id, so a reconnecting EventSource resumes via Last-Event-ID (or
+    ?last_id=). An idle connection is one parked coroutine and a comment
+    line every NOTIFICATION_SSE_KEEPALIVE_SECONDS.
+    """
+    user = await authenticate_request(request)
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_id") or ""
+    last_id = int(last_id) if last_id.isdigit() else None
+
+    layer = get_channel_layer()
+    # Default prefix: shares the process's receive loop with the WebSocket consumers
+    channel = await layer.new_channel()
+    groups = [user_group(user.id)] + audience_groups(user.role, user.branch_id)
+    for group in groups:
+        await layer.group_add(group, channel)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            if last_id is not None:
+                limit = settings.NOTIFICATION_WS_REPLAY_LIMIT
+                missed = await database_sync_to_async(notifications_after)(user, last_id, limit + 1)
+                if len(missed) > limit:
+                    yield _event("resync", {})
+                else:
+                    for payload in missed:
+                        yield _event("notification", payload, payload["id"])
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        layer.receive(channel), settings.NOTIFICATION_SSE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message.get("type") == "send_notification":
+                    payload = message.get("payload", {})
+                    yield _event("notification", payload, payload.get("id"))
+        finally:
+            for group in groups:
+                await layer.group_discard(group, channel)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
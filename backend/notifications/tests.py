@@ -1,3 +1,90 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from branches.models import Branch
+from tickets.models import Ticket
+from users.models import User
+from .emails import send_digests, send_or_queue
+from .models import Notification, QueuedEmail, UnreadCounter
+
+
+# ======================================================
+# Emails
+# ======================================================
+@override_settings(NOTIFICATION_COALESCE_SECONDS=300)
+class CoalescedEmailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", "staff@naita.lk", "pw", role="STAFF")
+
+    def send(self, message, coalesce=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_or_queue([self.user], "Ticket Update: #1", message, coalesce=coalesce)
+
+    def test_merged_updates_are_emailed_once_when_the_window_closes(self):
+        self.send("Assigned to t1")
+        self.send("Status changed to IN_PROGRESS", coalesce=True)
+        self.send("Status changed to RESOLVED", coalesce=True)
+        self.assertEqual([m.body for m in mail.outbox], ["Assigned to t1"])
+
+        self.assertEqual(send_digests(), 0)
+        self.assertEqual(send_digests(now=timezone.now() + timedelta(seconds=301)), 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn("Status changed to RESOLVED", mail.outbox[1].body)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_new_immediate_email_supersedes_the_held_one(self):
+        self.send("Status changed to IN_PROGRESS", coalesce=True)
+        self.send("Ticket reopened")
+        self.assertEqual([m.body for m in mail.outbox], ["Ticket reopened"])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+
+# ======================================================
+# Unread Count
+# ======================================================
+@override_settings(TICKET_AUTO_ASSIGN=False)
+class BroadcastUnreadCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name="Colombo")
+        cls.tech = User.objects.create_user("t1", "t1@naita.lk", "pw", role="TECHNICIAN", branch=cls.branch)
+        cls.other_tech = User.objects.create_user("t2", "t2@naita.lk", "pw", role="TECHNICIAN", branch=cls.branch)
+        cls.staff = User.objects.create_user("staff", "staff@naita.lk", "pw", role="STAFF", branch=cls.branch)
+        cls.ticket = Ticket.objects.create(title="Printer jammed", created_by=cls.staff, branch=cls.branch)
+        # Start from an empty bell: drop what creating the ticket routed
+        Notification.objects.all().delete()
+        UnreadCounter.objects.all().delete()
+
+    def client_for(self, username):
+        client = APIClient()
+        access = client.post("/api/auth/login/", {"username": username, "password": "pw"}, format="json").data["access"]
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def unread(self, client):
+        return client.get("/api/notifications/unread_count/").json()["unread_count"]
+
+    def test_reading_broadcasts_moves_only_the_readers_watermark(self):
+        first = Notification.broadcast(self.ticket, "New ticket", role="TECHNICIAN", branch_id=self.branch.pk)
+        Notification.broadcast(self.ticket, "Ticket escalated", role="TECHNICIAN", branch_id=self.branch.pk)
+        Notification.notify(self.tech, self.ticket, "Assigned to t1")
+        tech, other_tech = self.client_for("t1"), self.client_for("t2")
+
+        self.assertEqual(self.unread(tech), 3)
+        self.assertEqual(self.unread(other_tech), 2)
+        self.assertEqual(self.unread(self.client_for("staff")), 0)
+
+        marked = tech.post("/api/notifications/mark_read/", {"ids": [first.pk]}, format="json")
+        self.assertEqual(marked.json()["unread_count"], 2)
+        self.assertEqual(self.unread(other_tech), 2)
+
+        tech.post("/api/notifications/mark_all_read/")
+        self.assertEqual(self.unread(tech), 0)
+        Notification.broadcast(self.ticket, "Another ticket", role="TECHNICIAN")
+        self.assertEqual(self.unread(tech), 1)
+        self.assertEqual(self.unread(other_tech), 3)
@@ -1,20 +1,112 @@
-from rest_framework import viewsets
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Notification
-from .serializers import NotificationSerializer
+from naita_servicedesk.conditional import conditional_response, queryset_validator
+from users.authentication import ClaimsAuthenticationMixin
+from .models import Notification, UnreadCounter, BroadcastReceipt, DigestPreference
+from .pagination import NotificationCursorPagination
+from .serializers import NotificationSerializer, MarkReadSerializer, DigestPreferenceSerializer
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(
+    ClaimsAuthenticationMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    # No create: notifications come from ticket events only; a client-made row
+    # without a user would be a broadcast to everyone
     serializer_class = NotificationSerializer
+    claims_actions = ("list", "retrieve", "unread_count")
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
-         return Notification.objects.filter(user=self.request.user).order_by("-created_at")
+         return Notification.feed_for(self.request.user).select_related("ticket")
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        watermark = BroadcastReceipt.get(request.user.id)
+
+        def respond():
+            page = Notification.apply_watermark(self.paginate_queryset(queryset), watermark)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data["unread_count"] = Notification.unread_count(request.user)
+            return response
+
+        # Read flags bump updated_at (see mark()); broadcast read state is the watermark;
+        # ticket_title/ticket_status come from the ticket row
+        validator = (request.user.pk, queryset_validator(queryset, "ticket__updated_at"), watermark)
+        return conditional_response(request, validator, respond)
+
+    def perform_destroy(self, instance):
+        if instance.is_broadcast:
+            raise PermissionDenied("Broadcast notifications cannot be deleted.")
+        # UnreadCounter follows via the post_delete receiver
+        instance.delete()
+
+    def perform_update(self, serializer):
+        if serializer.instance.is_broadcast:
+            raise PermissionDenied("Broadcast notifications cannot be edited.")
+        was_read = serializer.instance.read
+        notification = serializer.save()
+        if notification.read != was_read:
+            UnreadCounter.add(notification.user_id, -1 if notification.read else 1)
+
+    @action(detail=False, methods=["get"], url_path="unread_count")
+    def unread_count(self, request):
+        return Response({"unread_count": Notification.unread_count(request.user)})
+
+    @action(detail=False, methods=["get", "put", "patch"], url_path="preferences")
+    def preferences(self, request):
+        """Email delivery preference: immediate, every N minutes or hourly digest."""
+        preference, _ = DigestPreference.objects.get_or_create(user=request.user)
+        if request.method == "GET":
+            return Response(DigestPreferenceSerializer(preference).data)
+        serializer = DigestPreferenceSerializer(preference, data=request.data, partial=request.method == "PATCH")
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
 
     @action(detail=True, methods=["post"])
     def read(self, request, pk=None):
         notification = self.get_object()
-        notification.read = True
-        notification.save()
+        self.mark(request.user, [notification.id])
         return Response({"message": "Notification marked as read"})
+
+    @action(detail=False, methods=["post"], url_path="mark_read")
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = self.mark(request.user, serializer.validated_data["ids"])
+        return Response({"updated": updated, "unread_count": Notification.unread_count(request.user)})
+
+    @action(detail=False, methods=["post"], url_path="mark_all_read")
+    def mark_all_read(self, request):
+        updated = Notification.objects.filter(user=request.user, read=False).update(
+            read=True, updated_at=timezone.now()
+        )
+        UnreadCounter.reset(request.user.id)
+        BroadcastReceipt.advance_to_latest(request.user.id)
+        return Response({"updated": updated, "unread_count": 0})
+
+    def mark(self, user, ids):
+        """
+        Single UPDATE for the user's own notifications; broadcasts among `ids`
+        move the read watermark up to the newest of them.
+        """
+        updated = Notification.objects.filter(user=user, id__in=ids, read=False).update(
+            read=True, updated_at=timezone.now()
+        )
+        if updated:
+            UnreadCounter.add(user.id, -updated)
+        newest_broadcast = (
+            Notification.objects.filter(Notification.audience_q(user), id__in=ids).aggregate(m=Max("id"))["m"]
+        )
+        BroadcastReceipt.advance(user.id, newest_broadcast)
+        return updated
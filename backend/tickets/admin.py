@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Ticket, TicketHistory, Division
+from .models import Ticket, TicketHistory, Division, SLAPolicy
 
 
 # ----------------------------
@@ -29,12 +29,23 @@ class TicketAdmin(admin.ModelAdmin):
         "assigned_to",
         "created_at",
         "updated_at",
+        "due_date",
+        "is_overdue",
     )
-    list_filter = ("status", "priority", "branch", "category", "division")
+    list_filter = ("status", "priority", "branch", "category", "division", "is_overdue")
     search_fields = ("title", "description")
     readonly_fields = ("created_at", "updated_at")
 
 
+# ----------------------------
+# SLA Policy Admin
+# ----------------------------
+@admin.register(SLAPolicy)
+class SLAPolicyAdmin(admin.ModelAdmin):
+    list_display = ("priority", "category", "resolution_hours", "warning_hours")
+    list_filter = ("priority", "category")
+
+
 # ----------------------------
 # TicketHistory Admin
 # ----------------------------
@@ -3,7 +3,6 @@ from rest_framework.response import Response
 from rest_framework import permissions
 from django.db.models import Count, F, Q, Value
 from django.db.models.functions import Coalesce
-from django.utils import timezone
 from django.utils.dateparse import parse_date
 from django.http import HttpResponse
 import csv
@@ -37,8 +36,6 @@ def ticket_stats(request):
     - end_date (YYYY-MM-DD)
     - export=csv
     """
-    now = timezone.now()
-
     # ------------------------
     # Date Filtering
     # ------------------------
@@ -78,10 +75,8 @@ def ticket_stats(request):
         .order_by("-count")
     )
 
-    overdue = tickets_qs.filter(
-        status__in=["OPEN", "ASSIGNED", "IN_PROGRESS"],
-        due_date__lt=now
-    ).count()
+    # Maintained by the SLA scheduler (manage.py run_sla_scheduler)
+    overdue = tickets_qs.filter(is_overdue=True).count()
 
     # ------------------------
     # CSV Export
@@ -8,3 +8,4 @@ class TicketsConfig(AppConfig):
     def ready(self):
         # Import signals to make sure they are registered
         import tickets.signals
+        import naita_servicedesk.checks
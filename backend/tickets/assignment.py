@@ -0,0 +1,192 @@
+# tickets/assignment.py
+
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from .models import Ticket, Division
+
+User = get_user_model()
+
+# Pool key wildcard: technician has no branch / no division restriction
+ANY = None
+
+
+# ======================================================
+# Workload Index
+# ======================================================
+class WorkloadIndex:
+    """
+    In-memory min-heap of open ticket counts per technician.
+
+    Technicians are grouped into pools keyed by (branch_id, division_id);
+    a technician without a branch or without divisions lands in the
+    wildcard pool for that dimension. Each pool is a heap of
+    (open_count, technician_id) entries with lazy deletion: when a count
+    changes a fresh entry is pushed and stale ones are discarded on peek,
+    so picking the least-loaded technician is O(log n).
+
+    The index is rebuilt from the database on first use and when
+    technicians change; a periodic per-technician count check resyncs it
+    with the ticket table (e.g. tickets reassigned by another process).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._counts = {}               # technician_id -> open ticket count
+        self._memberships = {}          # technician_id -> set of pool keys
+        self._pools = {}                # pool key -> heap of (count, technician_id)
+        self._category_divisions = {}   # category_id -> [division_id, ...]
+        self._checked_at = None
+        self._dirty = True
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def choose(self, branch_id=None, division_id=None, category_id=None):
+        """
+        Return the id of the least-loaded technician for a new ticket,
+        or None if no technician is eligible.
+
+        Pools are tried from most to least specific:
+        (branch, division) → (branch, any) → (any, division) → (any, any).
+        """
+        with self._lock:
+            self._ensure_fresh()
+            if division_id:
+                divisions = [division_id]
+            else:
+                divisions = self._category_divisions.get(category_id, [])
+
+            keys = [(branch_id, d) for d in divisions] + [(branch_id, ANY)]
+            keys += [(ANY, d) for d in divisions] + [(ANY, ANY)]
+
+            for key in keys:
+                technician_id = self._peek(key)
+                if technician_id is not None:
+                    return technician_id
+            return None
+
+    def adjust(self, technician_id, delta):
+        """Apply a +/- change to a technician's open ticket count."""
+        with self._lock:
+            if technician_id not in self._counts:
+                return
+            count = max(self._counts[technician_id] + delta, 0)
+            self._counts[technician_id] = count
+            for key in self._memberships[technician_id]:
+                heap = self._pools[key]
+                heapq.heappush(heap, (count, technician_id))
+                if len(heap) > 2 * len(self._memberships) + 16:
+                    self._compact(key)
+
+    def load(self, technician_id):
+        """Current open ticket count for a technician (0 if unknown)."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._counts.get(technician_id, 0)
+
+    def invalidate(self):
+        """Force a rebuild on next use (technicians, branches or divisions changed)."""
+        with self._lock:
+            self._dirty = True
+
+    def tracks(self, technician_id):
+        """Whether the technician is in the index (to tell a demotion from an unrelated user)."""
+        with self._lock:
+            return technician_id in self._counts
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._dirty or self._checked_at is None:
+            self._rebuild()
+        elif now - self._checked_at > settings.TICKET_ASSIGNMENT_RESYNC_SECONDS:
+            # Per-technician counts, so reassignments elsewhere (same total) are seen too
+            self._resync(self._open_counts())
+            self._checked_at = now
+
+    def _open_counts(self):
+        return dict(
+            Ticket.objects.filter(
+                status__in=Ticket.OPEN_STATUSES,
+                assigned_to__role__iexact="technician",
+                assigned_to__is_active=True,
+            )
+            .values_list("assigned_to")
+            .annotate(count=Count("id"))
+        )
+
+    def _resync(self, open_counts):
+        if not open_counts.keys() <= self._counts.keys():
+            self._rebuild()  # a technician the index does not know yet
+            return
+        for technician_id, count in self._counts.items():
+            actual = open_counts.get(technician_id, 0)
+            if actual != count:
+                self.adjust(technician_id, actual - count)
+
+    def _rebuild(self):
+        technicians = (
+            User.objects.filter(role__iexact="technician", is_active=True)
+            .prefetch_related("divisions")
+        )
+        open_counts = self._open_counts()
+
+        counts, memberships, pools = {}, {}, {}
+        for tech in technicians:
+            division_ids = [d.id for d in tech.divisions.all()] or [ANY]
+            keys = {(tech.branch_id, d) for d in division_ids}
+            counts[tech.id] = open_counts.get(tech.id, 0)
+            memberships[tech.id] = keys
+            for key in keys:
+                pools.setdefault(key, []).append((counts[tech.id], tech.id))
+        for heap in pools.values():
+            heapq.heapify(heap)
+
+        category_divisions = {}
+        for division_id, category_id in Division.categories.through.objects.values_list(
+            "division_id", "category_id"
+        ):
+            category_divisions.setdefault(category_id, []).append(division_id)
+
+        self._counts = counts
+        self._memberships = memberships
+        self._pools = pools
+        self._category_divisions = category_divisions
+        self._checked_at = time.monotonic()
+        self._dirty = False
+
+    def _peek(self, key):
+        heap = self._pools.get(key)
+        while heap:
+            count, technician_id = heap[0]
+            if self._counts.get(technician_id) == count and key in self._memberships.get(technician_id, ()):
+                return technician_id
+            heapq.heappop(heap)
+        return None
+
+    def _compact(self, key):
+        heap = [
+            (count, tid) for tid, count in self._counts.items()
+            if key in self._memberships[tid]
+        ]
+        heapq.heapify(heap)
+        self._pools[key] = heap
+
+
+# Process-wide index used by views and signals
+workload_index = WorkloadIndex()
+
+
+def open_assignee(status, assigned_to_id):
+    """Technician whose workload a ticket in this state counts towards."""
+    if assigned_to_id and status in Ticket.OPEN_STATUSES:
+        return assigned_to_id
+    return None
@@ -0,0 +1,107 @@
+# tickets/async_views.py
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from naita_servicedesk.conditional import aconditional_response, aqueryset_validator
+from notifications.auth import async_authenticated
+from .filters import TicketFilterSerializer, TicketPagination, filter_tickets, scoped_tickets
+from .models import Ticket
+from .page_cache import embedded_versions
+from .serializers import TicketSerializer
+
+# Async variants of the hot ticket reads for ASGI deployments: while the
+# database or a slow client is busy the worker serves other requests instead
+# of holding a thread. Bearer-token (or session) auth without a user query,
+# same role scopes, filters, paging and ETags as TicketViewSet.
+
+
+async def _serialize(request, tickets):
+    # Evaluating the queryset also runs its prefetches; serialization then touches no database
+    rows = [ticket async for ticket in tickets]
+    return TicketSerializer(rows, many=True, context={"request": request}).data
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get(TicketPagination.page_size_query_param, ""))
+    except ValueError:
+        return None
+    return min(size, TicketPagination.max_page_size) if size > 0 else None
+
+
+# ----------------------------
+# Ticket List
+# ----------------------------
+@require_GET
+@async_authenticated
+async def ticket_list(request):
+    params = TicketFilterSerializer(data=request.GET.dict())
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=400)
+    tickets = filter_tickets(scoped_tickets(request.user), params.validated_data)
+
+    async def respond():
+        page_size = _page_size(request)
+        if page_size is None:
+            return JsonResponse(await _serialize(request, tickets), safe=False)
+
+        page = request.GET.get("page", "1")
+        count = await tickets.acount()
+        pages = max((count + page_size - 1) // page_size, 1)
+        if not page.isdigit() or not 1 <= int(page) <= pages:
+            return JsonResponse({"detail": "Invalid page."}, status=404)
+        page = int(page)
+
+        url = request.build_absolute_uri()
+        previous = None
+        if page > 1:
+            previous = replace_query_param(url, "page", page - 1) if page > 2 else remove_query_param(url, "page")
+        return JsonResponse({
+            "count": count,
+            "next": replace_query_param(url, "page", page + 1) if page < pages else None,
+            "previous": previous,
+            "results": await _serialize(request, tickets[(page - 1) * page_size:page * page_size]),
+        })
+
+    validator = (request.user.pk, await aqueryset_validator(tickets), await sync_to_async(embedded_versions)())
+    return await aconditional_response(request, validator, respond)
+
+
+# ----------------------------
+# Ticket Detail
+# ----------------------------
+@require_GET
+@async_authenticated
+async def ticket_detail(request, pk):
+    tickets = scoped_tickets(request.user).filter(pk=pk)
+    updated_at = await tickets.values_list("updated_at", flat=True).afirst()
+    if updated_at is None:
+        return JsonResponse({"detail": "No Ticket matches the given query."}, status=404)
+
+    async def respond():
+        return JsonResponse((await _serialize(request, tickets))[0])
+
+    validator = (request.user.pk, updated_at, await sync_to_async(embedded_versions)())
+    return await aconditional_response(request, validator, respond)
+
+
+# ----------------------------
+# Ticket Stats
+# ----------------------------
+@require_GET
+@async_authenticated
+async def ticket_stats(request):
+    groups = {
+        "by_status": "status",
+        "by_priority": "priority",
+        "by_branch": "branch__name",
+        "by_technician": "assigned_to__username",
+    }
+    data = {}
+    for name, column in groups.items():
+        data[name] = [row async for row in Ticket.objects.values(column).annotate(count=Count("id"))]
+    return JsonResponse(data)
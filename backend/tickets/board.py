@@ -0,0 +1,161 @@
+# tickets/board.py
+
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+
+from django.db import transaction
+
+from notifications.resilience import group_send
+
+logger = logging.getLogger(__name__)
+
+# Channel-layer group every process's board dispatcher listens on
+BOARD_GROUP = "ticket_board"
+
+INSERT = "insert"
+UPDATE = "update"
+REMOVE = "remove"
+
+# Subscription wildcard (no restriction on that field)
+ANY = "*"
+
+SNAPSHOT_FIELDS = (
+    "id", "title", "status", "priority", "branch_id", "division_id", "category_id",
+    "assigned_to_id", "created_by_id", "is_overdue",
+)
+
+Subscription = namedtuple("Subscription", "branch_id statuses assigned_to_id created_by_id")
+
+
+def board_snapshot(ticket):
+    """The ticket fields a board row shows and subscriptions match on (JSON-safe)."""
+    snapshot = {field: getattr(ticket, field) for field in SNAPSHOT_FIELDS}
+    snapshot["due_date"] = ticket.due_date.isoformat() if ticket.due_date else None
+    snapshot["updated_at"] = ticket.updated_at.isoformat() if ticket.updated_at else None
+    return snapshot
+
+
+def matches(subscription, snapshot):
+    if snapshot is None:
+        return False
+    return (
+        subscription.branch_id in (ANY, snapshot["branch_id"])
+        and (subscription.statuses is ANY or snapshot["status"] in subscription.statuses)
+        and subscription.assigned_to_id in (ANY, snapshot["assigned_to_id"])
+        and subscription.created_by_id in (ANY, snapshot["created_by_id"])
+    )
+
+
+# ======================================================
+# Subscription Index
+# ======================================================
+class BoardIndex:
+    """
+    Board subscriptions of the WebSocket connections in this process.
+
+    Subscriptions are bucketed by branch (or ANY), so a change only checks
+    connections watching the ticket's old or new branch plus the unscoped
+    ones. Comparing the old and new snapshot against a subscription gives
+    the delta: entered the filter (insert), stayed (update), left (remove).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}    # channel name -> Subscription
+        self._by_branch = {}        # branch_id or ANY -> set of channel names
+
+    def add(self, channel_name, subscription):
+        with self._lock:
+            self._remove(channel_name)
+            self._subscriptions[channel_name] = subscription
+            self._by_branch.setdefault(subscription.branch_id, set()).add(channel_name)
+
+    def remove(self, channel_name):
+        with self._lock:
+            self._remove(channel_name)
+
+    def deltas(self, old, new):
+        """(channel name, op, snapshot) for every subscription the change affects."""
+        branches = {ANY} | {s["branch_id"] for s in (old, new) if s}
+        with self._lock:
+            candidates = set().union(*(self._by_branch.get(b, ()) for b in branches))
+            subscriptions = [(c, self._subscriptions[c]) for c in candidates]
+
+        result = []
+        for channel_name, subscription in subscriptions:
+            was, now = matches(subscription, old), matches(subscription, new)
+            if now:
+                result.append((channel_name, UPDATE if was else INSERT, new))
+            elif was:
+                result.append((channel_name, REMOVE, old))
+        return result
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def _remove(self, channel_name):
+        subscription = self._subscriptions.pop(channel_name, None)
+        if subscription is None:
+            return
+        bucket = self._by_branch.get(subscription.branch_id)
+        if bucket:
+            bucket.discard(channel_name)
+            if not bucket:
+                del self._by_branch[subscription.branch_id]
+
+
+# Process-wide index used by TicketBoardConsumer
+board_index = BoardIndex()
+
+
+# ======================================================
+# Dispatcher
+# ======================================================
+class BoardDispatcher:
+    """
+    One channel per process joined to BOARD_GROUP: each ticket change is
+    received once per process, matched against `board_index`, and only the
+    resulting deltas are sent to the local connections.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.channel_name = None
+        self._task = None
+
+    async def ensure_started(self, channel_layer):
+        if self._task is None or self._task.done():
+            # Default prefix: channels_redis serves every "specific." channel of the
+            # process from one shared receive loop; a prefix of its own would
+            # compete for the receive lock and stall the consumers
+            self.channel_name = await channel_layer.new_channel()
+            self._task = asyncio.ensure_future(self._run(channel_layer))
+        # Re-joining refreshes the group membership before it can expire
+        await channel_layer.group_add(BOARD_GROUP, self.channel_name)
+
+    async def _run(self, channel_layer):
+        while True:
+            message = await channel_layer.receive(self.channel_name)
+            try:
+                for channel_name, op, snapshot in self.index.deltas(message.get("old"), message.get("new")):
+                    await channel_layer.send(channel_name, {"type": "ticket.delta", "op": op, "ticket": snapshot})
+            except Exception:
+                logger.exception("Failed to dispatch ticket board change")
+
+
+board_dispatcher = BoardDispatcher(board_index)
+
+
+# -----------------------------
+# Publishing
+# -----------------------------
+def publish_change(old, new):
+    """Announce a ticket change (snapshots, None for created/deleted) once the transaction commits."""
+    if old == new:
+        return
+
+    transaction.on_commit(
+        lambda: group_send(BOARD_GROUP, {"type": "ticket.change", "old": old, "new": new})
+    )
@@ -0,0 +1,89 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .board import ANY, Subscription, board_dispatcher, board_index
+from .models import Ticket
+
+STATUSES = {key for key, _ in Ticket.STATUS_CHOICES}
+
+
+class TicketBoardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live ticket board. The client sends
+        {"action": "subscribe", "branch": 3, "status": ["OPEN"], "assigned_to": 7 | "none"}
+    (every key optional) and then receives {"type": "insert" | "update" | "remove",
+    "ticket": {...}} for tickets entering, changing within or leaving that filter.
+
+    Filters are narrowed to the user's role like the ticket list: staff only
+    see tickets they created, technicians only tickets assigned to them.
+    Subscribe before loading the list over REST so no change falls in between.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+        self.user = user
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        board_index.remove(self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get("action")
+        if action == "unsubscribe":
+            board_index.remove(self.channel_name)
+            await self.send_json({"type": "unsubscribed"})
+            return
+        if action != "subscribe":
+            await self.send_json({"type": "error", "detail": "Unknown action."})
+            return
+
+        subscription, error = self.parse_filter(content)
+        if error:
+            await self.send_json({"type": "error", "detail": error})
+            return
+        board_index.add(self.channel_name, subscription)
+        await board_dispatcher.ensure_started(self.channel_layer)
+        applied = subscription._asdict()
+        if subscription.statuses is not ANY:
+            applied["statuses"] = sorted(subscription.statuses)
+        await self.send_json({"type": "subscribed", "filter": applied})
+
+    def parse_filter(self, content):
+        branch = content.get("branch")
+        if branch is not None and not isinstance(branch, int):
+            return None, "branch must be an id."
+
+        statuses = content.get("status") or ANY
+        if statuses is not ANY:
+            statuses = [statuses] if isinstance(statuses, str) else statuses
+            statuses = frozenset(str(s).upper() for s in statuses)
+            if statuses - STATUSES:
+                return None, f"Invalid status(es): {', '.join(sorted(statuses - STATUSES))}"
+
+        assigned_to = content.get("assigned_to", ANY)
+        if assigned_to == "none":
+            assigned_to = None
+        elif assigned_to is not ANY and not isinstance(assigned_to, int):
+            return None, "assigned_to must be a user id or 'none'."
+
+        # Role scope (same as TicketViewSet.get_queryset)
+        created_by = ANY
+        role = (getattr(self.user, "role", "") or "").lower()
+        if role == "staff":
+            created_by = self.user.id
+        elif role == "technician":
+            if assigned_to not in (ANY, self.user.id):
+                return None, "Technicians can only watch their own tickets."
+            assigned_to = self.user.id
+
+        return Subscription(
+            branch_id=ANY if branch is None else branch,
+            statuses=statuses,
+            assigned_to_id=assigned_to,
+            created_by_id=created_by,
+        ), None
+
+    async def ticket_delta(self, event):
+        await self.send_json({"type": event["op"], "ticket": event["ticket"]})
@@ -0,0 +1,210 @@
+# tickets/duplicates.py
+
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Ticket, TicketFingerprint
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS          # ~0.5 Jaccard detection threshold
+SHINGLE_SIZE = 3
+_PRIME = (1 << 31) - 1
+
+# Fixed seed: signatures must be identical across processes and restarts
+_rng = random.Random(20251009)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+Match = namedtuple("Match", "id title status similarity")
+
+
+# -----------------------------
+# MinHash helpers
+# -----------------------------
+def shingles(text):
+    """Character 3-grams of the normalized text."""
+    text = " ".join(re.findall(r"[a-z0-9]+", (text or "").lower()))
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(title, description=""):
+    hashes = [zlib.crc32(s.encode()) for s in shingles(f"{title} {description or ''}")]
+    if not hashes:
+        return array("I", [_PRIME] * NUM_PERM)
+    return array("I", [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS])
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _bands(sig):
+    return [(i, tuple(sig[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS)]
+
+
+# ======================================================
+# Duplicate Index
+# ======================================================
+class DuplicateIndex:
+    """
+    In-memory LSH index over MinHash signatures of recent open tickets.
+
+    Signatures are persisted in TicketFingerprint so a restart only reloads
+    them; tickets changed by other processes are picked up by an incremental
+    sync on `updated_at`. At most once per DUPLICATE_SYNC_SECONDS a lookup
+    runs that sync query first; queries never run under the index lock, so
+    other lookups and saves only wait for in-memory work.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._buckets = {}      # (band, band_hash) -> set of ticket ids
+        self._tickets = {}      # ticket id -> (branch_id, created_at, title, status, signature)
+        self._synced_at = None
+        self._checked_at = None
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def find(self, title, description="", branch_id=None, exclude_id=None, limit=5):
+        """Return Match tuples of likely duplicates, best first."""
+        sig = signature(title, description)
+        self._sync()
+        with self._lock:
+            cutoff = timezone.now() - timedelta(hours=settings.DUPLICATE_WINDOW_HOURS)
+            candidates = set()
+            for band in _bands(sig):
+                candidates |= self._buckets.get(band, set())
+            candidates.discard(exclude_id)
+
+            matches = []
+            for ticket_id in candidates:
+                t_branch, created_at, t_title, t_status, t_sig = self._tickets[ticket_id]
+                if t_branch != branch_id or created_at < cutoff:
+                    continue
+                score = similarity(sig, t_sig)
+                if score >= settings.DUPLICATE_THRESHOLD:
+                    matches.append(Match(ticket_id, t_title, t_status, round(score, 2)))
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        return matches[:limit]
+
+    def update(self, ticket, sig=None):
+        """Index (or drop) a ticket after it was saved."""
+        indexed = ticket.status in Ticket.OPEN_STATUSES and not ticket.duplicate_of_id
+        if sig is None and indexed:
+            with self._lock:
+                entry = self._tickets.get(ticket.id)
+            if entry is not None:
+                sig = entry[4]
+            else:
+                fingerprint = TicketFingerprint.objects.filter(ticket=ticket).first()
+                sig = array("I", bytes(fingerprint.signature)) if fingerprint else None
+        with self._lock:
+            self._discard(ticket.id)
+            if indexed and sig is not None:
+                self._add(ticket.id, ticket.branch_id, ticket.created_at, ticket.title, ticket.status, sig)
+
+    def discard(self, ticket_id):
+        with self._lock:
+            self._discard(ticket_id)
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _add(self, ticket_id, branch_id, created_at, title, status, sig):
+        self._tickets[ticket_id] = (branch_id, created_at, title, status, sig)
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(ticket_id)
+
+    def _discard(self, ticket_id):
+        entry = self._tickets.pop(ticket_id, None)
+        if entry is None:
+            return
+        for band in _bands(entry[4]):
+            bucket = self._buckets.get(band)
+            if bucket:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _sync(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at and now - self._checked_at < settings.DUPLICATE_SYNC_SECONDS:
+                return
+            # Claim this sync: concurrent lookups keep using the index meanwhile
+            self._checked_at, synced_at = now, self._synced_at
+
+        try:
+            started = timezone.now()
+            cutoff = started - timedelta(hours=settings.DUPLICATE_WINDOW_HOURS)
+            changes, missing = self._load_changes(synced_at, cutoff)
+            if missing:
+                TicketFingerprint.objects.bulk_create(missing, ignore_conflicts=True)
+        except Exception:
+            with self._lock:
+                self._checked_at = None  # let the next lookup retry
+            raise
+
+        with self._lock:
+            if synced_at is None:
+                self._buckets, self._tickets = {}, {}
+            for ticket_id, entry in changes:
+                self._discard(ticket_id)
+                if entry is not None:
+                    self._add(ticket_id, *entry)
+            # Forget tickets that aged out of the window
+            for ticket_id in [k for k, v in self._tickets.items() if v[1] < cutoff]:
+                self._discard(ticket_id)
+            self._synced_at = started
+
+    def _load_changes(self, synced_at, cutoff):
+        """
+        [(ticket id, index entry or None to drop)] for tickets changed since
+        `synced_at` (all recent ones if None), plus fingerprints to persist.
+        """
+        tickets = Ticket.objects.filter(created_at__gte=cutoff)
+        if synced_at:
+            # Overlap the last sync so late commits are not skipped; re-indexing is idempotent
+            overlap = timedelta(seconds=settings.DUPLICATE_SYNC_OVERLAP_SECONDS)
+            tickets = tickets.filter(updated_at__gte=synced_at - overlap)
+        rows = tickets.values_list(
+            "id", "branch_id", "created_at", "title", "description", "status",
+            "duplicate_of_id", "fingerprint__signature",
+        )
+
+        changes, missing = [], []
+        for ticket_id, branch_id, created_at, title, description, status, duplicate_of, raw in rows:
+            if status not in Ticket.OPEN_STATUSES or duplicate_of:
+                changes.append((ticket_id, None))
+                continue
+            if raw is None:
+                sig = signature(title, description)
+                missing.append(TicketFingerprint(ticket_id=ticket_id, signature=sig.tobytes()))
+            else:
+                sig = array("I", bytes(raw))
+            changes.append((ticket_id, (branch_id, created_at, title, status, sig)))
+        return changes, missing
+
+
+# Process-wide index used by views, serializers and signals
+duplicate_index = DuplicateIndex()
+
+
+def fingerprint_ticket(ticket):
+    """Persist the ticket's signature and refresh its index entry."""
+    sig = signature(ticket.title, ticket.description)
+    TicketFingerprint.objects.update_or_create(ticket=ticket, defaults={"signature": sig.tobytes()})
+    duplicate_index.update(ticket, sig)
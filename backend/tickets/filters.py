@@ -0,0 +1,193 @@
+# tickets/filters.py
+
+from collections import Counter
+
+from django.db.models import Count
+from rest_framework import serializers
+from rest_framework.pagination import PageNumberPagination
+
+from .models import Ticket
+
+# Public sort key -> indexed column (prefix with "-" for descending)
+SORT_FIELDS = {
+    "created_at": "created_at",
+    "completed_at": "completed_at",
+    "due_date": "due_date",
+    "id": "id",
+}
+DEFAULT_ORDERING = "-created_at"
+
+# Facet param -> (grouped column, label column)
+FACETS = {
+    "status": ("status", None),
+    "priority": ("priority", None),
+    "branch": ("branch_id", "branch__name"),
+    "category": ("category_id", "category__name"),
+}
+CHOICE_LABELS = {
+    "status": dict(Ticket.STATUS_CHOICES),
+    "priority": dict(Ticket.PRIORITY_CHOICES),
+}
+
+
+# ======================================================
+# Ticket Filter Serializer
+# ======================================================
+class CommaSeparatedChoiceField(serializers.Field):
+    """Accepts `a,b,c` and validates every item against `choices`."""
+
+    def __init__(self, choices, **kwargs):
+        self.choices = {str(key).upper() for key, _ in choices}
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        values = [v.strip().upper() for v in str(data).split(",") if v.strip()]
+        invalid = [v for v in values if v not in self.choices]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid value(s): {', '.join(invalid)}")
+        return values
+
+    def to_representation(self, value):
+        return ",".join(value)
+
+
+class TicketFilterSerializer(serializers.Serializer):
+    """
+    Validates ticket list query params. Every filter maps onto an indexed
+    column and unknown sort keys are rejected.
+    """
+    status = CommaSeparatedChoiceField(Ticket.STATUS_CHOICES, required=False)
+    priority = CommaSeparatedChoiceField(Ticket.PRIORITY_CHOICES, required=False)
+    branch = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.IntegerField(required=False, min_value=1)
+    division = serializers.IntegerField(required=False, min_value=1)
+    assigned_to = serializers.CharField(required=False, help_text="User id, or 'none' for unassigned")
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    completed_after = serializers.DateTimeField(required=False)
+    completed_before = serializers.DateTimeField(required=False)
+    overdue = serializers.BooleanField(required=False, allow_null=True, default=None)
+    ordering = serializers.CharField(required=False, default=DEFAULT_ORDERING)
+
+    def validate_assigned_to(self, value):
+        if value.lower() == "none":
+            return None
+        if not value.isdigit():
+            raise serializers.ValidationError("Must be a user id or 'none'.")
+        return int(value)
+
+    def validate_ordering(self, value):
+        if value.lstrip("-") not in SORT_FIELDS:
+            raise serializers.ValidationError(
+                f"Unknown sort key. Allowed: {', '.join(sorted(SORT_FIELDS))} (prefix '-' for descending)."
+            )
+        return value
+
+
+def visible_tickets(user):
+    """Tickets the user may see: staff their own, technicians those assigned to them, admins all."""
+    role = (getattr(user, "role", "") or "").lower()
+    if role == "staff":
+        return Ticket.objects.filter(created_by_id=user.pk)
+    if role == "technician":
+        return Ticket.objects.filter(assigned_to_id=user.pk)
+    return Ticket.objects.all()
+
+
+def scoped_tickets(user):
+    """visible_tickets() with everything TicketSerializer reads, newest first."""
+    return (
+        visible_tickets(user)
+        .select_related("created_by", "assigned_to", "branch", "division", "category")
+        .prefetch_related("history__performed_by")
+        .order_by("-created_at")
+    )
+
+
+def filter_tickets(queryset, params, exclude=()):
+    """
+    Apply validated TicketFilterSerializer data to a ticket queryset.
+    Params named in `exclude` are skipped.
+    """
+    params = {k: v for k, v in params.items() if k not in exclude}
+    lookups = {
+        "status": "status__in",
+        "priority": "priority__in",
+        "branch": "branch_id",
+        "category": "category_id",
+        "division": "division_id",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lte",
+        "completed_after": "completed_at__gte",
+        "completed_before": "completed_at__lte",
+    }
+    filters = {lookups[k]: v for k, v in params.items() if k in lookups and v not in (None, [])}
+    if "assigned_to" in params:
+        filters["assigned_to_id"] = params["assigned_to"]
+    if params.get("overdue") is not None:
+        filters["is_overdue"] = params["overdue"]
+
+    ordering = params.get("ordering", DEFAULT_ORDERING)
+    column = SORT_FIELDS[ordering.lstrip("-")]
+    descending = ordering.startswith("-")
+    return queryset.filter(**filters).order_by(
+        f"-{column}" if descending else column, "-id" if descending else "id"
+    )
+
+
+def facet_counts(queryset, params):
+    """
+    Counts per facet value where each facet honours every *other* active filter.
+
+    One GROUP BY over all facet columns (with the non-facet filters applied)
+    is folded in Python: a grouped row contributes to facet F when it matches
+    the selections of all facets except F.
+    """
+    base = filter_tickets(queryset, params, exclude=FACETS).order_by()
+    columns = [c for column, label in FACETS.values() for c in (column, label) if c]
+    rows = base.values(*columns).annotate(count=Count("id"))
+
+    selected = {}
+    for name in FACETS:
+        value = params.get(name)
+        if value not in (None, []):
+            selected[name] = set(value) if isinstance(value, list) else {value}
+
+    counts = {name: Counter() for name in FACETS}
+    labels = {(name, key): label for name, choices in CHOICE_LABELS.items() for key, label in choices.items()}
+    for row in rows:
+        matches = {
+            name: name not in selected or row[column] in selected[name]
+            for name, (column, _) in FACETS.items()
+        }
+        for name, (column, label) in FACETS.items():
+            if all(ok for other, ok in matches.items() if other != name):
+                counts[name][row[column]] += row["count"]
+                if label:
+                    labels[(name, row[column])] = row[label]
+
+    return {
+        name: [
+            {"value": value, "label": labels.get((name, value), value), "count": count}
+            for value, count in counter.most_common()
+        ]
+        for name, counter in counts.items()
+    }
+
+
+# ======================================================
+# Pagination
+# ======================================================
+class TicketPagination(PageNumberPagination):
+    """
+    Opt-in paging: responses stay a plain list unless `page_size` is sent,
+    so existing clients keep working while screens fetch only what they show.
+    """
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class TicketSearchPagination(TicketPagination):
+    """Search always pages; the admin screen shows 20 rows by default."""
+    page_size = 20
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tickets.sla import SLAScheduler
+
+
+class Command(BaseCommand):
+    help = "Run the SLA scheduler: mark overdue tickets and send warning/breach escalations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process currently due events and exit")
+        parser.add_argument("--poll", type=int, default=None, help="Seconds between polls for changed tickets")
+
+    def handle(self, *args, **options):
+        scheduler = SLAScheduler(poll_interval=options["poll"])
+        if options["once"]:
+            scheduler.poll()
+            scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS("SLA events processed."))
+            return
+
+        self.stdout.write("SLA scheduler running (Ctrl+C to stop)...")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("SLA scheduler stopped.")
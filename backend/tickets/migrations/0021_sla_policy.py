@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('tickets', '0020_alter_ticket_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='is_overdue',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_warned',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='SLAPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High')], max_length=10)),
+                ('resolution_hours', models.PositiveIntegerField(help_text='Hours from creation until the ticket is due')),
+                ('warning_hours', models.PositiveIntegerField(default=0, help_text='Hours before the due date to send a warning (0 = none)')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='categories.category')),
+            ],
+            options={
+                'verbose_name': 'SLA policy',
+                'verbose_name_plural': 'SLA policies',
+                'unique_together': {('priority', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0021_sla_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='tickets.ticket'),
+        ),
+        migrations.CreateModel(
+            name='TicketFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField()),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='tickets.ticket')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+def drop_extra_defaults(apps, schema_editor):
+    """Keep the oldest default (no category) policy per priority."""
+    SLAPolicy = apps.get_model("tickets", "SLAPolicy")
+    seen = set()
+    for policy in SLAPolicy.objects.filter(category__isnull=True).order_by("id"):
+        if policy.priority in seen:
+            policy.delete()
+        seen.add(policy.priority)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('tickets', '0023_ticket_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_extra_defaults, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='slapolicy',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='slapolicy',
+            constraint=models.UniqueConstraint(fields=('priority', 'category'), name='sla_policy_priority_category_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='slapolicy',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('priority',), name='sla_policy_priority_default_uniq'),
+        ),
+    ]
@@ -48,6 +48,9 @@ class Ticket(models.Model):
         (STATUS_CLOSED, "Closed"),
     ]
 
+    # Statuses that still count towards a technician's workload
+    OPEN_STATUSES = (STATUS_OPEN, STATUS_ASSIGNED, STATUS_IN_PROGRESS)
+
     PRIORITY_LOW = "LOW"
     PRIORITY_MEDIUM = "MEDIUM"
     PRIORITY_HIGH = "HIGH"
@@ -60,8 +63,8 @@ class Ticket(models.Model):
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
-    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default=PRIORITY_LOW)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default=PRIORITY_LOW, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN, db_index=True)
 
     branch = models.ForeignKey(Branch, on_delete=models.SET_NULL, null=True, blank=True)
     division = models.ForeignKey(Division, on_delete=models.SET_NULL, null=True, blank=True)
@@ -71,7 +74,9 @@ class Ticket(models.Model):
     email = models.EmailField(blank=True, null=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     file = models.FileField(upload_to=ticket_file_path, blank=True, null=True, max_length=500)
-    due_date = models.DateTimeField(null=True, blank=True)
+    due_date = models.DateTimeField(null=True, blank=True, db_index=True)
+    is_overdue = models.BooleanField(default=False, db_index=True)
+    sla_warned = models.BooleanField(default=False)
 
     created_by = models.ForeignKey(
         User,
@@ -85,10 +90,17 @@ class Ticket(models.Model):
         blank=True,
         related_name="tickets_assigned"
     )
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates"
+    )
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
-    completed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def save(self, *args, **kwargs):
         # Automatically set completed_at when status is COMPLETED
@@ -96,12 +108,56 @@ class Ticket(models.Model):
             self.completed_at = timezone.now()
         elif self.status != self.STATUS_COMPLETED:
             self.completed_at = None
+        # Only open tickets can be overdue
+        if self.status not in self.OPEN_STATUSES:
+            self.is_overdue = False
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} - {self.status}"
 
 
+# ----------------------------
+# Ticket fingerprint model
+# ----------------------------
+class TicketFingerprint(models.Model):
+    """Persisted MinHash signature of a ticket's title and description."""
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, related_name="fingerprint")
+    signature = models.BinaryField()
+
+    def __str__(self):
+        return f"Fingerprint for ticket #{self.ticket_id}"
+
+
+# ----------------------------
+# SLA policy model
+# ----------------------------
+class SLAPolicy(models.Model):
+    """
+    Resolution target for tickets of a priority, optionally narrowed to a category.
+    A policy without category is the default for that priority.
+    """
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    resolution_hours = models.PositiveIntegerField(help_text="Hours from creation until the ticket is due")
+    warning_hours = models.PositiveIntegerField(default=0, help_text="Hours before the due date to send a warning (0 = none)")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["priority", "category"], name="sla_policy_priority_category_uniq"),
+            # NULLs never collide above: one default (no category) per priority
+            models.UniqueConstraint(
+                fields=["priority"], condition=models.Q(category__isnull=True), name="sla_policy_priority_default_uniq"
+            ),
+        ]
+        verbose_name = "SLA policy"
+        verbose_name_plural = "SLA policies"
+
+    def __str__(self):
+        scope = self.category.name if self.category else "All categories"
+        return f"{self.priority} / {scope}: {self.resolution_hours}h"
+
+
 # ----------------------------
 # TicketHistory model
 # ----------------------------
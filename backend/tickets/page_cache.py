@@ -0,0 +1,95 @@
+# tickets/page_cache.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from naita_servicedesk.conditional import BRANCHES, CATEGORIES, DIVISIONS, USERS, bump_version, get_versions
+
+# Role scopes: every ticket, tickets created by a user, tickets assigned to a user
+ALL = "all"
+
+
+def creator_scope(user_id):
+    return f"creator:{user_id}"
+
+
+def assignee_scope(user_id):
+    return f"assignee:{user_id}"
+
+
+def embedded_versions():
+    """Versions of the rows a serialized ticket embeds besides the ticket itself (names)."""
+    return get_versions(BRANCHES, DIVISIONS, CATEGORIES, USERS)
+
+
+def list_scope(user):
+    """Scope of the ticket list (and `mine`) for this user, as in TicketViewSet.get_queryset."""
+    role = (getattr(user, "role", "") or "").lower()
+    if role == "staff":
+        return creator_scope(user.pk)
+    if role == "technician":
+        return assignee_scope(user.pk)
+    return ALL
+
+
+# ======================================================
+# Ticket Page Cache
+# ======================================================
+class TicketPageCache:
+    """
+    Rendered JSON of ticket list pages, keyed by (scope, scope version,
+    URL with filters and page). Writing a ticket bumps the versions of the
+    scopes it belongs to, so stale pages are never read again and simply
+    age out: nothing is scanned or deleted.
+
+    Pages also embed branch/division/category and user names, so those
+    tables' versions are part of the key (embedded_versions).
+
+    Version bumps only come from processes sharing the cache (see check
+    naita_servicedesk.W001), so the caller's database validator, the one
+    behind its ETag, is part of the key too: writes the counters never saw
+    (other processes on LocMemCache, the SLA scheduler) still miss, and
+    body and ETag always agree.
+    """
+
+    KEY = "ticketpage:{}:{}"
+
+    def key(self, request, scope, validator=None):
+        versions = get_versions(f"tickets:{scope}") + embedded_versions()
+        digest = hashlib.md5(repr((request.get_full_path(), versions, validator)).encode(), usedforsecurity=False)
+        return self.KEY.format(scope, digest.hexdigest())
+
+    def get_or_render(self, request, scope, render, validator=None):
+        """Cached bytes for this page, else `render()` and keep them."""
+        timeout = settings.TICKET_PAGE_CACHE_SECONDS
+        if not timeout:
+            return render()
+        key = self.key(request, scope, validator)
+        content = cache.get(key)
+        if content is None:
+            content = render()
+            cache.set(key, content, timeout)
+        return content
+
+    def invalidate(self, *scopes):
+        """Bump `scopes` after commit, so no reader caches pre-commit rows under the new version."""
+        scopes = {s for s in scopes if s}
+
+        def bump():
+            for scope in scopes:
+                bump_version(f"tickets:{scope}")
+
+        transaction.on_commit(bump)
+
+    def invalidate_ticket(self, created_by_id, *assigned_to_ids):
+        self.invalidate(
+            ALL,
+            created_by_id and creator_scope(created_by_id),
+            *(assignee_scope(i) for i in assigned_to_ids if i),
+        )
+
+
+ticket_pages = TicketPageCache()
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Ticket, TicketHistory, Branch, Division, Category
+from .duplicates import duplicate_index
+from naita_servicedesk.identity import CachedPrimaryKeyRelatedField
 from notifications.models import Notification
 
 User = get_user_model()
@@ -52,6 +54,14 @@ class DivisionSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
+class DivisionReferenceSerializer(DivisionSerializer):
+    """Division with the ids of its categories (combined reference data)."""
+    categories = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta(DivisionSerializer.Meta):
+        fields = DivisionSerializer.Meta.fields + ["categories"]
+
+
 # ======================================================
 # Category Serializer
 # ======================================================
@@ -97,6 +107,9 @@ class TicketSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "completed_at",
+            "due_date",
+            "is_overdue",
+            "duplicate_of",
             "history",
             "created_by_name",
             "creator_email",
@@ -108,6 +121,9 @@ class TicketSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "completed_at",
+            "due_date",
+            "is_overdue",
+            "duplicate_of",
             "history",
         ]
 
@@ -132,10 +148,12 @@ class TicketSerializer(serializers.ModelSerializer):
 # Ticket Create Serializer
 # ======================================================
 class TicketCreateSerializer(serializers.ModelSerializer):
-    branch = serializers.PrimaryKeyRelatedField(queryset=Branch.objects.all())
+    branch = CachedPrimaryKeyRelatedField(queryset=Branch.objects.all())
     division = serializers.PrimaryKeyRelatedField(queryset=Division.objects.all(), required=False, allow_null=True)
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    category = CachedPrimaryKeyRelatedField(queryset=Category.objects.all())
     file = serializers.FileField(required=False, allow_null=True)
+    duplicate_of = serializers.PrimaryKeyRelatedField(queryset=Ticket.objects.all(), required=False, allow_null=True)
+    possible_duplicates = serializers.SerializerMethodField()
 
     class Meta:
         model = Ticket
@@ -150,8 +168,55 @@ class TicketCreateSerializer(serializers.ModelSerializer):
             "email",
             "phone",
             "file",
+            "duplicate_of",
+            "possible_duplicates",
         ]
 
+    def validate_duplicate_of(self, value):
+        # A duplicate skips the admin alert and auto-assignment, so it must point at a live ticket
+        if value is None:
+            return value
+        if value.status not in Ticket.OPEN_STATUSES:
+            raise serializers.ValidationError("Only open tickets can be marked as the original.")
+        return value
+
+    def validate(self, attrs):
+        # Any open ticket of the branch may be the original, as offered by possible_duplicates
+        duplicate_of, branch = attrs.get("duplicate_of"), attrs.get("branch")
+        if duplicate_of is not None and branch is not None and duplicate_of.branch_id != branch.id:
+            raise serializers.ValidationError({"duplicate_of": "The original ticket must be in the same branch."})
+        return attrs
+
+    def get_possible_duplicates(self, obj):
+        """Warn the requester about open tickets in the same branch that look the same."""
+        if obj.duplicate_of_id:
+            return []
+        return DuplicateSerializer(
+            duplicate_index.find(obj.title, obj.description, obj.branch_id, exclude_id=obj.id),
+            many=True,
+        ).data
+
+
+# ======================================================
+# Duplicate Serializers
+# ======================================================
+class DuplicateSerializer(serializers.Serializer):
+    """
+    Match returned by the duplicate index. Shown to anyone filing a ticket in
+    the branch, whoever owns the match, so it stays this minimal projection:
+    no description, requester or contact details.
+    """
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    status = serializers.CharField()
+    similarity = serializers.FloatField()
+
+
+class DuplicateLookupSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    branch = CachedPrimaryKeyRelatedField(queryset=Branch.objects.all())
+
 
 # ======================================================
 # Ticket Status Update Serializer
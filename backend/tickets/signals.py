@@ -1,39 +1,26 @@
 # tickets/signals.py
 
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.db import transaction
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.conf import settings
 
-from tickets.models import Ticket, TicketHistory
-from notifications.models import Notification  
+from branches.models import Branch
+from categories.models import Category
+from naita_servicedesk import conditional
+from naita_servicedesk.identity import cached_related
+from tickets.models import Ticket, TicketHistory, Division
+from tickets.assignment import workload_index, open_assignee
+from tickets.sla import apply_sla
+from tickets.duplicates import duplicate_index, fingerprint_ticket
+from tickets.board import board_snapshot, publish_change
+from tickets.page_cache import ticket_pages
+from notifications import recipients
+from notifications.recipients import deliver
 
 User = get_user_model()
 
 
-# -----------------------------
-# Helper: Create Notification & Email
-# -----------------------------
-def create_notification(ticket, recipient, message, send_email=False):
-    """Helper to create a notification and optionally send an email."""
-    if not recipient:
-        return
-
-    # In-app notification
-    Notification.objects.create(user=recipient, ticket=ticket, message=message)
-
-    # Optional email
-    if send_email and recipient.email:
-        send_mail(
-            subject=f"Ticket Update: #{ticket.id}",
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient.email],
-            fail_silently=True,
-        )
-
-
 # -----------------------------
 # Pre-save: Track old values
 # -----------------------------
@@ -46,15 +33,29 @@ def track_ticket_changes(sender, instance, **kwargs):
     if not instance.pk:  # new ticket
         instance._old_status = None
         instance._old_assigned = None
+        instance._old_assigned_id = None
+        instance._old_text = None
+        instance._old_board = None
+        apply_sla(instance)
         return
 
     try:
         previous = Ticket.objects.get(pk=instance.pk)
         instance._old_status = previous.status
-        instance._old_assigned = previous.assigned_to
+        instance._old_assigned = cached_related(previous, "assigned_to")
+        instance._old_assigned_id = previous.assigned_to_id
+        instance._old_text = (previous.title, previous.description)
+        instance._old_board = board_snapshot(previous)
+        # Due date moved: let the SLA scheduler escalate again
+        if previous.due_date != instance.due_date:
+            instance.is_overdue = False
+            instance.sla_warned = False
     except Ticket.DoesNotExist:
         instance._old_status = None
         instance._old_assigned = None
+        instance._old_assigned_id = None
+        instance._old_text = None
+        instance._old_board = None
 
 
 # -----------------------------
@@ -65,34 +66,55 @@ def log_ticket_history_and_notify(sender, instance, created, **kwargs):
     """
     After saving a ticket:
     - Log history of creation, status changes, assignment changes
-    - Create notifications for creator, assigned technician, and admins
+    - Notify whoever NOTIFICATION_ROUTES sends each event to
     """
-    changed_by = getattr(instance, "_changed_by", instance.created_by)
+    created_by = cached_related(instance, "created_by")
+    assigned_to = cached_related(instance, "assigned_to")
+    changed_by = getattr(instance, "_changed_by", created_by)
 
     if created:
         # ---------------- History ----------------
         TicketHistory.objects.create(
             ticket=instance,
             action=f"Ticket '{instance.title}' created",
-            performed_by=instance.created_by,
+            performed_by=created_by,
         )
 
         # ---------------- Notify creator ----------------
-        create_notification(
-            ticket=instance,
-            recipient=instance.created_by,
-            message=f"Your ticket #{instance.id} '{instance.title}' has been created.",
-            send_email=True,
+        deliver(
+            recipients.TICKET_CONFIRMED,
+            instance,
+            f"Your ticket #{instance.id} '{instance.title}' has been created.",
         )
 
+        # ---------------- Linked duplicate ----------------
+        # Already reported: record the link instead of alerting every admin again
+        if instance.duplicate_of_id:
+            TicketHistory.objects.create(
+                ticket=instance,
+                action=f"Linked as duplicate of ticket #{instance.duplicate_of_id}",
+                performed_by=created_by,
+            )
+            return
+
         # ---------------- Notify admins ----------------
-        admins = User.objects.filter(role__iexact="admin", is_active=True)
-        for admin in admins:
-            create_notification(
+        deliver(
+            recipients.TICKET_CREATED,
+            instance,
+            f"New ticket #{instance.id} created by {created_by.username}.",
+        )
+
+        # ---------------- Auto-assignment ----------------
+        if assigned_to:
+            TicketHistory.objects.create(
                 ticket=instance,
-                recipient=admin,
-                message=f"New ticket #{instance.id} created by {instance.created_by.username}.",
-                send_email=True,
+                action=f"Auto-assigned to {assigned_to.username}",
+                performed_by=created_by,
+            )
+            deliver(
+                recipients.TICKET_ASSIGNED,
+                instance,
+                f"You have been assigned to ticket #{instance.id}: '{instance.title}'.",
             )
 
     else:
@@ -103,44 +125,149 @@ def log_ticket_history_and_notify(sender, instance, created, **kwargs):
                 action=f"Status changed from {instance._old_status} to {instance.status}",
                 performed_by=changed_by,
             )
-            create_notification(
-                ticket=instance,
-                recipient=instance.created_by,
-                message=f"Status of ticket #{instance.id} changed to {instance.status}.",
-                send_email=True,
+            deliver(
+                recipients.STATUS_CHANGED,
+                instance,
+                f"Status of ticket #{instance.id} changed to {instance.status}.",
             )
 
         # ---------------- Assignment change ----------------
-        if hasattr(instance, "_old_assigned") and instance.assigned_to != instance._old_assigned:
-            assigned_name = instance.assigned_to.username if instance.assigned_to else "Unassigned"
+        if hasattr(instance, "_old_assigned") and assigned_to != instance._old_assigned:
+            assigned_name = assigned_to.username if assigned_to else "Unassigned"
             TicketHistory.objects.create(
                 ticket=instance,
                 action=f"Assigned to {assigned_name}",
                 performed_by=changed_by,
             )
-            if instance.assigned_to:
-                create_notification(
-                    ticket=instance,
-                    recipient=instance.assigned_to,
-                    message=f"You have been assigned to ticket #{instance.id}: '{instance.title}'.",
-                    send_email=True,
+            if assigned_to:
+                deliver(
+                    recipients.TICKET_ASSIGNED,
+                    instance,
+                    f"You have been assigned to ticket #{instance.id}: '{instance.title}'.",
                 )
 
 
 # -----------------------------
-# Extra post-save: Notify admins on ticket creation
+# Workload index maintenance
 # -----------------------------
 @receiver(post_save, sender=Ticket)
-def notify_admins_on_ticket(sender, instance, created, **kwargs):
-    """
-    Creates Notification objects for all active admins when a new ticket is created.
-    This ensures the notifications app can broadcast via channels.
-    """
-    if created:
-        admins = User.objects.filter(role__iexact="admin", is_active=True)
-        for admin in admins:
-            Notification.objects.create(
-                user=admin,
-                ticket=instance,
-                message=f"New ticket created: {instance.title}"
-            )
+def update_workload_on_save(sender, instance, created, **kwargs):
+    """Move a ticket's weight between technicians when it is (re)assigned or closed."""
+    old = open_assignee(getattr(instance, "_old_status", None), getattr(instance, "_old_assigned_id", None))
+    new = open_assignee(instance.status, instance.assigned_to_id)
+    if old != new:
+        # After commit: a rolled-back assignment must not move the counts
+        if old:
+            transaction.on_commit(lambda: workload_index.adjust(old, -1))
+        if new:
+            transaction.on_commit(lambda: workload_index.adjust(new, +1))
+
+
+@receiver(post_delete, sender=Ticket)
+def update_workload_on_delete(sender, instance, **kwargs):
+    technician_id = open_assignee(instance.status, instance.assigned_to_id)
+    if technician_id:
+        transaction.on_commit(lambda: workload_index.adjust(technician_id, -1))
+
+
+# -----------------------------
+# Duplicate index maintenance
+# -----------------------------
+@receiver(post_save, sender=Ticket)
+def update_duplicate_index(sender, instance, created, **kwargs):
+    """Re-fingerprint when the text changes; otherwise just refresh the index entry."""
+    if created or getattr(instance, "_old_text", None) != (instance.title, instance.description):
+        fingerprint_ticket(instance)
+    else:
+        duplicate_index.update(instance)
+
+
+@receiver(post_delete, sender=Ticket)
+def drop_from_duplicate_index(sender, instance, **kwargs):
+    duplicate_index.discard(instance.id)
+
+
+# -----------------------------
+# Live ticket board
+# -----------------------------
+@receiver(post_save, sender=Ticket)
+def publish_board_change(sender, instance, **kwargs):
+    publish_change(getattr(instance, "_old_board", None), board_snapshot(instance))
+
+
+@receiver(post_delete, sender=Ticket)
+def publish_board_removal(sender, instance, **kwargs):
+    publish_change(board_snapshot(instance), None)
+
+
+# -----------------------------
+# Ticket list page cache
+# -----------------------------
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_pages(sender, instance, **kwargs):
+    ticket_pages.invalidate_ticket(
+        instance.created_by_id, instance.assigned_to_id, getattr(instance, "_old_assigned_id", None)
+    )
+
+
+@receiver(post_save, sender=TicketHistory)
+def invalidate_ticket_pages_on_history(sender, instance, **kwargs):
+    # History is embedded in every serialized ticket
+    ticket = instance.ticket
+    ticket_pages.invalidate_ticket(ticket.created_by_id, ticket.assigned_to_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_workload_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """Technician role, branch or status changed: rebuild lazily."""
+    if update_fields and set(update_fields) <= {"last_login"}:
+        # Logins do not change who can take tickets
+        return
+    if (instance.role or "").lower() != "technician" and not workload_index.tracks(instance.pk):
+        # Neither a technician now nor before
+        return
+    workload_index.invalidate()
+
+
+@receiver(m2m_changed, sender=User.divisions.through)
+def invalidate_workload_index(sender, **kwargs):
+    """Technician divisions changed: rebuild lazily."""
+    workload_index.invalidate()
+
+
+# -----------------------------
+# Reference data versions (ETags of the branch/division/category lists and
+# of ticket lists embedding their names and user names)
+# -----------------------------
+def _bump_on_commit(scope):
+    # After commit: a reader must never pair the new version with old rows
+    transaction.on_commit(lambda: conditional.bump_version(scope))
+
+
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def bump_branches_version(sender, **kwargs):
+    _bump_on_commit(conditional.BRANCHES)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_categories_version(sender, **kwargs):
+    _bump_on_commit(conditional.CATEGORIES)
+
+
+@receiver(post_save, sender=Division)
+@receiver(post_delete, sender=Division)
+@receiver(m2m_changed, sender=Division.categories.through)
+def bump_divisions_version(sender, **kwargs):
+    _bump_on_commit(conditional.DIVISIONS)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_users_version(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    _bump_on_commit(conditional.USERS)
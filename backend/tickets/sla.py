@@ -0,0 +1,185 @@
+# tickets/sla.py
+
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Ticket, SLAPolicy
+from .board import board_snapshot, publish_change
+from .page_cache import ticket_pages
+from notifications.models import Notification
+from notifications.signals import push_created
+from notifications.emails import send_or_queue
+from notifications.recipients import recipient_index, SLA_WARNING, SLA_BREACH
+
+logger = logging.getLogger(__name__)
+
+EVENT_WARNING = "warning"
+EVENT_BREACH = "breach"
+
+
+# -----------------------------
+# Policy lookup
+# -----------------------------
+def policy_for(priority, category_id=None):
+    """Category-specific policy for the priority, else the priority default."""
+    policies = SLAPolicy.objects.filter(
+        Q(category_id=category_id) | Q(category__isnull=True), priority=priority
+    )
+    best = None
+    for policy in policies:
+        if policy.category_id:
+            return policy
+        best = policy
+    return best
+
+
+def apply_sla(ticket):
+    """Set `due_date` on a new ticket from its SLA policy (if any)."""
+    if ticket.due_date:
+        return
+    policy = policy_for(ticket.priority, ticket.category_id)
+    if policy:
+        ticket.due_date = (ticket.created_at or timezone.now()) + timedelta(hours=policy.resolution_hours)
+
+
+# ======================================================
+# SLA Scheduler
+# ======================================================
+class SLAScheduler:
+    """
+    Time-ordered heap of upcoming SLA deadlines.
+
+    Open tickets with a due date are loaded once, then only tickets changed
+    since the last poll are pulled in. When an event's time passes, all
+    events due in that tick are validated in one query and fired together:
+    `is_overdue` / `sla_warned` are flipped with a single UPDATE per kind and
+    notifications (recipients from NOTIFICATION_ROUTES) are bulk-inserted,
+    then pushed over the channel layer.
+    Stale heap entries (ticket closed, due date moved) are dropped on fire.
+    """
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or settings.SLA_SCHEDULER_POLL_SECONDS
+        self._heap = []
+        self._polled_at = None
+        self._recent = {}  # ticket id -> updated_at already scheduled within the overlap
+        self._warning_hours = {}
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    def poll(self):
+        """Push deadline events for tickets created or changed since the last poll."""
+        started = timezone.now()
+        self._warning_hours = {
+            (p.priority, p.category_id): p.warning_hours for p in SLAPolicy.objects.all()
+        }
+
+        tickets = Ticket.objects.filter(
+            status__in=Ticket.OPEN_STATUSES, due_date__isnull=False, is_overdue=False
+        )
+        overlap = timedelta(seconds=settings.SLA_SCHEDULER_OVERLAP_SECONDS)
+        if self._polled_at:
+            # Re-read an overlap window: a transaction committing after the last
+            # poll carries an updated_at from before it
+            tickets = tickets.filter(updated_at__gte=self._polled_at - overlap)
+
+        for ticket_id, priority, category_id, due_date, warned, updated_at in tickets.values_list(
+            "id", "priority", "category_id", "due_date", "sla_warned", "updated_at"
+        ):
+            if self._recent.get(ticket_id) == updated_at:
+                continue  # unchanged since it was scheduled
+            self._recent[ticket_id] = updated_at
+            self.schedule(ticket_id, priority, category_id, due_date, warned)
+
+        horizon = started - overlap
+        self._recent = {k: v for k, v in self._recent.items() if v >= horizon}
+        self._polled_at = started
+
+    def schedule(self, ticket_id, priority, category_id, due_date, warned=False):
+        heapq.heappush(self._heap, (due_date, EVENT_BREACH, ticket_id, due_date))
+        hours = self._warning_hours.get((priority, category_id), self._warning_hours.get((priority, None), 0))
+        if hours and not warned:
+            heapq.heappush(self._heap, (due_date - timedelta(hours=hours), EVENT_WARNING, ticket_id, due_date))
+
+    # ----------------------------
+    # Firing
+    # ----------------------------
+    def run_once(self, now=None):
+        """Fire every event due at `now`; return the time of the next pending event."""
+        now = now or timezone.now()
+        due = {EVENT_WARNING: {}, EVENT_BREACH: {}}
+        while self._heap and self._heap[0][0] <= now:
+            _, kind, ticket_id, due_date = heapq.heappop(self._heap)
+            due[kind][ticket_id] = due_date
+
+        if due[EVENT_BREACH]:
+            self._fire(EVENT_BREACH, due[EVENT_BREACH])
+        # A breach supersedes a warning for the same ticket
+        warnings = {k: v for k, v in due[EVENT_WARNING].items() if k not in due[EVENT_BREACH]}
+        if warnings:
+            self._fire(EVENT_WARNING, warnings)
+
+        return self._heap[0][0] if self._heap else None
+
+    def _fire(self, kind, events):
+        flag = "is_overdue" if kind == EVENT_BREACH else "sla_warned"
+        tickets = [
+            t for t in Ticket.objects.filter(
+                id__in=events.keys(), status__in=Ticket.OPEN_STATUSES, **{flag: False}
+            )
+            if t.due_date == events[t.id]
+        ]
+        if not tickets:
+            return
+
+        Ticket.objects.filter(id__in=[t.id for t in tickets]).update(**{flag: True}, updated_at=timezone.now())
+        # update() skips post_save: drop cached list pages...
+        for ticket in tickets:
+            ticket_pages.invalidate_ticket(ticket.created_by_id, ticket.assigned_to_id)
+        if kind == EVENT_BREACH:
+            # ...and tell live boards the tickets are overdue
+            for ticket in tickets:
+                old = board_snapshot(ticket)
+                ticket.is_overdue = True
+                publish_change(old, board_snapshot(ticket))
+
+        notifications = []
+        for ticket in tickets:
+            if kind == EVENT_BREACH:
+                event = SLA_BREACH
+                message = f"SLA breached: ticket #{ticket.id} '{ticket.title}' is overdue."
+            else:
+                event = SLA_WARNING
+                message = f"SLA warning: ticket #{ticket.id} '{ticket.title}' is due {ticket.due_date:%Y-%m-%d %H:%M}."
+            delivery = recipient_index.resolve(event, ticket)
+            notifications += [Notification(user_id=r.id, ticket=ticket, message=message) for r in delivery.in_app]
+            notifications += [
+                Notification(ticket=ticket, message=message, audience_role=role, audience_branch_id=branch_id)
+                for role, branch_id in delivery.broadcasts
+            ]
+            if delivery.email:
+                send_or_queue(delivery.email, f"Ticket Update: #{ticket.id}", message)
+
+        # bulk_create skips post_save: update counters and push explicitly
+        push_created(Notification.objects.bulk_create(notifications))
+
+        logger.info("SLA %s fired for %d ticket(s)", kind, len(tickets))
+
+    # ----------------------------
+    # Main loop
+    # ----------------------------
+    def run_forever(self):
+        while True:
+            self.poll()
+            next_at = self.run_once()
+            wait = self.poll_interval
+            if next_at:
+                wait = min(wait, max((next_at - timezone.now()).total_seconds(), 0))
+            time.sleep(wait)
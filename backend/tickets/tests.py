@@ -1,16 +1,151 @@
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
-from .models import Ticket, TicketHistory
-
-@receiver(pre_save, sender=Ticket)
-def create_ticket_history(sender, instance, **kwargs):
-    if instance.id:  # existing ticket
-        previous = Ticket.objects.get(id=instance.id)
-        if previous.status != instance.status:
-            TicketHistory.objects.create(
-                ticket=instance,
-                old_status=previous.status,
-                new_status=instance.status,
-                changed_by=getattr(instance, "_changed_by", None),  # custom tracking
-                note=f"Status changed from {previous.status} to {instance.status}"
-            )
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from branches.models import Branch
+from categories.models import Category
+from users.models import User
+from .duplicates import duplicate_index
+from .models import SLAPolicy, Ticket
+from .sla import policy_for
+
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+def bearer_client(username, password="pw"):
+    """API client authenticated like the frontend: a Bearer access token from the login view."""
+    client = APIClient()
+    access = client.post("/api/auth/login/", {"username": username, "password": password}, format="json").data["access"]
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER, TICKET_AUTO_ASSIGN=False)
+class TicketTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = Branch.objects.create(name="Colombo")
+        cls.category = Category.objects.create(name="Printer")
+        cls.admin = User.objects.create_user("admin", "admin@naita.lk", "pw", role="ADMIN")
+        cls.staff = User.objects.create_user("staff", "staff@naita.lk", "pw", role="STAFF", branch=cls.branch)
+        cls.colleague = User.objects.create_user("colleague", "colleague@naita.lk", "pw", role="STAFF", branch=cls.branch)
+        cls.other_branch = Branch.objects.create(name="Galle")
+
+    def setUp(self):
+        # Version counters, identity rows and rendered pages live in the (process-wide) cache
+        cache.clear()
+        # Ids are reused between tests: make the duplicate index reload from this test's rows
+        duplicate_index._synced_at = duplicate_index._checked_at = None
+
+    def create_ticket(self, **fields):
+        fields = {
+            "title": "Printer jammed",
+            "description": "The printer on the second floor is jammed again",
+            "created_by": self.staff,
+            "branch": self.branch,
+            "category": self.category,
+            **fields,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return Ticket.objects.create(**fields)
+
+
+# ======================================================
+# ETag / Page Cache
+# ======================================================
+class TicketListCacheTests(TicketTestCase):
+    def test_out_of_process_write_changes_body_and_etag(self):
+        ticket = self.create_ticket()
+        client = bearer_client("admin")
+        etag = client.get("/api/tickets/")["ETag"]
+
+        # Another process (or the SLA scheduler) writes without bumping this process's versions
+        Ticket.objects.filter(pk=ticket.pk).update(title="Toner empty", updated_at=timezone.now())
+
+        response = client.get("/api/tickets/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()[0]["title"], "Toner empty")
+
+        revalidated = client.get("/api/tickets/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_unchanged_list_is_not_modified(self):
+        self.create_ticket()
+        client = bearer_client("admin")
+        etag = client.get("/api/tickets/")["ETag"]
+        self.assertEqual(client.get("/api/tickets/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+# ======================================================
+# Duplicate Detection
+# ======================================================
+class DuplicateTests(TicketTestCase):
+    def file_ticket(self, client, **fields):
+        data = {
+            "title": "Printer jammed on second floor",
+            "description": "The printer on the second floor is jammed again",
+            "priority": "LOW",
+            "branch": self.branch.pk,
+            "category": self.category.pk,
+            **fields,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post("/api/tickets/", data, format="json")
+
+    def test_colleague_is_warned_with_a_minimal_projection(self):
+        self.file_ticket(bearer_client("staff"))
+        original = Ticket.objects.get()
+
+        response = self.file_ticket(bearer_client("colleague"))
+        self.assertEqual(response.status_code, 201)
+        matches = response.json()["possible_duplicates"]
+        self.assertEqual([m["id"] for m in matches], [original.pk])
+        self.assertEqual(set(matches[0]), {"id", "title", "status", "similarity"})
+
+        lookup = bearer_client("colleague").get("/api/tickets/duplicates/", {
+            "title": "Printer jammed on second floor",
+            "description": "The printer on the second floor is jammed again",
+            "branch": self.branch.pk,
+        })
+        self.assertIn(original.pk, [m["id"] for m in lookup.json()])
+
+    def test_duplicate_of_accepts_open_tickets_of_the_branch_only(self):
+        original = self.create_ticket()
+        colleague = bearer_client("colleague")
+
+        self.assertEqual(self.file_ticket(colleague, duplicate_of=original.pk).status_code, 201)
+        other_branch = self.file_ticket(colleague, duplicate_of=original.pk, branch=self.other_branch.pk)
+        self.assertEqual(other_branch.status_code, 400)
+
+        Ticket.objects.filter(pk=original.pk).update(status=Ticket.STATUS_CLOSED)
+        self.assertEqual(self.file_ticket(colleague, duplicate_of=original.pk).status_code, 400)
+
+
+# ======================================================
+# SLA Policies
+# ======================================================
+class SLAPolicyTests(TicketTestCase):
+    def test_category_policy_wins_over_priority_default(self):
+        default = SLAPolicy.objects.create(priority="HIGH", resolution_hours=24)
+        printers = SLAPolicy.objects.create(priority="HIGH", category=self.category, resolution_hours=4)
+        other = Category.objects.create(name="Email")
+
+        self.assertEqual(policy_for("HIGH", self.category.pk), printers)
+        self.assertEqual(policy_for("HIGH", other.pk), default)
+        self.assertIsNone(policy_for("LOW", self.category.pk))
+
+    def test_due_date_follows_the_policy(self):
+        SLAPolicy.objects.create(priority="HIGH", category=self.category, resolution_hours=4)
+        ticket = self.create_ticket(priority="HIGH")
+        # Stamped before created_at is filled in on save
+        self.assertAlmostEqual(ticket.due_date, ticket.created_at + timedelta(hours=4), delta=timedelta(seconds=5))
+
+    def test_one_default_policy_per_priority(self):
+        SLAPolicy.objects.create(priority="HIGH", resolution_hours=24)
+        with self.assertRaises(IntegrityError):
+            SLAPolicy.objects.create(priority="HIGH", resolution_hours=48)
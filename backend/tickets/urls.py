@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TicketViewSet, NotificationViewSet
+from .views import TicketViewSet
+from notifications.views import NotificationViewSet
 
 # Initialize DRF router
 router = DefaultRouter()
@@ -1,41 +1,63 @@
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.shortcuts import get_object_or_404
+from rest_framework.renderers import JSONRenderer
+from django.http import Http404, HttpResponse
+from django.db import transaction
 from django.db.models import Count
-from django.core.mail import send_mail
-from django.contrib.auth import get_user_model
+from django.conf import settings
 
+from categories.models import Category
+from naita_servicedesk.conditional import BRANCHES, CATEGORIES, DIVISIONS, conditional_response, queryset_validator
+from naita_servicedesk.identity import user_cache
+from naita_servicedesk.reference import reference_response
+from users.authentication import CLAIMS_AUTHENTICATION_CLASSES, ClaimsAuthenticationMixin
 from .models import Ticket, Division, Branch, TicketHistory
+from .assignment import workload_index
+from .duplicates import duplicate_index
+from .page_cache import ALL, assignee_scope, embedded_versions, list_scope, ticket_pages
+from .filters import (
+    TicketFilterSerializer,
+    TicketPagination,
+    TicketSearchPagination,
+    filter_tickets,
+    facet_counts,
+    scoped_tickets,
+)
 from .serializers import (
     TicketSerializer,
     TicketCreateSerializer,
     TicketStatusUpdateSerializer,
     AssignTechnicianSerializer,
     DivisionSerializer,
+    DivisionReferenceSerializer,
     BranchSerializer,
+    CategorySerializer,
     TicketHistorySerializer,
+    DuplicateSerializer,
+    DuplicateLookupSerializer,
 )
-from notifications.models import Notification
-from notifications.serializers import NotificationSerializer
-
-User = get_user_model()
-
 
 # ======================================================
 # Ticket ViewSet
 # ======================================================
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ClaimsAuthenticationMixin, viewsets.ModelViewSet):
     queryset = Ticket.objects.all().order_by("-created_at")
+    # Reads scoped by role only: no user row needed (users/authentication.py)
+    claims_actions = (
+        "list", "retrieve", "mine", "assigned_tickets", "completed_tickets", "stats",
+        "history", "search", "duplicates", "divisions", "branches",
+    )
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = TicketPagination
 
     def get_serializer_class(self):
         if self.action == "create":
             return TicketCreateSerializer
         elif self.action in [
-            "mine", "list", "retrieve", "assigned_tickets", "history", "completed_tickets"
+            "mine", "list", "retrieve", "assigned_tickets", "history", "completed_tickets", "search"
         ]:
             return TicketSerializer
         elif self.action == "update_status":
@@ -48,32 +70,100 @@ class TicketViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if not user.is_authenticated:
             return Ticket.objects.none()
-
-        role = getattr(user, "role", "").lower()
-        if role == "staff":
-            return Ticket.objects.filter(created_by=user).order_by("-created_at")
-        elif role == "technician":
-            return Ticket.objects.filter(assigned_to=user).order_by("-created_at")
-        return Ticket.objects.all().order_by("-created_at")
+        return scoped_tickets(user)
+
+    def filter_queryset(self, queryset):
+        """Server-side filters and sort keys for the ticket list (see tickets/filters.py)."""
+        queryset = super().filter_queryset(queryset)
+        if self.action != "list":
+            return queryset
+        params = TicketFilterSerializer(data=self.request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        return filter_tickets(queryset, params.validated_data)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_list(request, queryset, scope=list_scope(request.user), paginate=True)
+
+    def conditional_list(self, request, tickets, scope=None, paginate=False, serialize=None):
+        """
+        Ticket list behind an ETag of the user's scope: unchanged lists answer
+        304 unserialized. JSON pages of a role `scope` are served from the
+        rendered page cache (tickets/page_cache.py).
+        """
+        serialize = serialize or (lambda rows: self.get_serializer(rows, many=True).data)
+
+        def data():
+            page = self.paginate_queryset(tickets) if paginate else None
+            if page is not None:
+                return self.get_paginated_response(serialize(page)).data
+            return serialize(tickets)
+
+        # Rows embed branch/division/category and user names besides the ticket's own columns
+        rows_validator = queryset_validator(tickets)
+        validator = (request.user.pk, rows_validator, embedded_versions())
+
+        def respond():
+            renderer = request.accepted_renderer
+            if scope is None or request.accepted_media_type != JSONRenderer.media_type:
+                return Response(data())
+            content = ticket_pages.get_or_render(
+                request, scope,
+                lambda: renderer.render(data(), renderer.media_type, self.get_renderer_context()),
+                validator=rows_validator,
+            )
+            return HttpResponse(content, content_type=renderer.media_type)
+
+        return conditional_response(request, validator, respond)
 
     # ----------------------------
     # Create Ticket
     # ----------------------------
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
-        ticket = serializer.save(
+        serializer.save(
             created_by=user,
             full_name=user.full_name,
             email=user.email,
-            phone=user.phone
+            phone=user.phone,
+            **self.auto_assignment(serializer.validated_data),
         )
-
-        # Notification
-        Notification.objects.create(
-            user=user,
-            ticket=ticket,
-            message=f"New ticket '{ticket.title}' created successfully."
+        # Notifications are routed from the post_save signal (notifications.recipients)
+
+    def auto_assignment(self, data):
+        """Pick the least-loaded eligible technician when auto-assignment is on."""
+        if not settings.TICKET_AUTO_ASSIGN or data.get("duplicate_of"):
+            return {}
+
+        branch, division, category = data.get("branch"), data.get("division"), data.get("category")
+        technician_id = workload_index.choose(
+            branch_id=branch.id if branch else None,
+            division_id=division.id if division else None,
+            category_id=category.id if category else None,
         )
+        if technician_id is None:
+            return {}
+        return {"assigned_to_id": technician_id, "status": Ticket.STATUS_ASSIGNED}
+
+    # ----------------------------
+    # Faceted Search
+    # ----------------------------
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        Current page of filtered tickets plus status/priority/branch/category
+        facet counts that respect all other active filters.
+        """
+        params = TicketFilterSerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        scope = self.get_queryset()
+
+        paginator = TicketSearchPagination()
+        page = paginator.paginate_queryset(filter_tickets(scope, params.validated_data), request, view=self)
+        response = paginator.get_paginated_response(TicketSerializer(page, many=True, context={"request": request}).data)
+        response.data["facets"] = facet_counts(scope, params.validated_data)
+        return response
 
     # ----------------------------
     # My Tickets
@@ -84,14 +174,13 @@ class TicketViewSet(viewsets.ModelViewSet):
         role = getattr(user, "role", "").lower()
 
         if role == "staff":
-            tickets = Ticket.objects.filter(created_by=user)
+            tickets = Ticket.objects.filter(created_by_id=user.pk)
         elif role == "technician":
-            tickets = Ticket.objects.filter(assigned_to=user)
+            tickets = Ticket.objects.filter(assigned_to_id=user.pk)
         else:
             tickets = Ticket.objects.all()
 
-        serializer = self.get_serializer(tickets.order_by("-created_at"), many=True)
-        return Response(serializer.data)
+        return self.conditional_list(request, tickets.order_by("-created_at"), scope=list_scope(user))
 
     # ----------------------------
     # Assigned Tickets
@@ -101,27 +190,47 @@ class TicketViewSet(viewsets.ModelViewSet):
         user = request.user
         role = getattr(user, "role", "").lower()
 
+        scope = None
         if role == "technician":
-            tickets = Ticket.objects.filter(assigned_to=user).order_by("-created_at")
+            tickets = Ticket.objects.filter(assigned_to_id=user.pk).order_by("-created_at")
+            scope = assignee_scope(user.pk)
         elif role == "admin":
             tickets = Ticket.objects.all().order_by("-created_at")
+            scope = ALL
         else:
             tickets = Ticket.objects.none()
 
-        serializer = self.get_serializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(request, tickets, scope=scope)
+
+    # ----------------------------
+    # Likely Duplicates
+    # ----------------------------
+    @action(detail=False, methods=["get"], url_path="duplicates")
+    def duplicates(self, request):
+        """Recent open tickets in the branch whose title/description look like the query."""
+        lookup = DuplicateLookupSerializer(data=request.query_params)
+        lookup.is_valid(raise_exception=True)
+        matches = duplicate_index.find(
+            lookup.validated_data["title"],
+            lookup.validated_data["description"],
+            lookup.validated_data["branch"].id,
+        )
+        return Response(DuplicateSerializer(matches, many=True).data)
 
     # ----------------------------
     # Assign Technician
     # ----------------------------
     @action(detail=True, methods=["post"], url_path="assign")
+    @transaction.atomic
     def assign_ticket(self, request, pk=None):
         ticket = self.get_object()
         serializer = AssignTechnicianSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         technician_id = serializer.validated_data["technician_id"]
-        technician = get_object_or_404(User, pk=technician_id, role__iexact="technician")
+        technician = user_cache.get(technician_id)
+        if technician is None or (technician.role or "").lower() != "technician":
+            raise Http404("No technician matches the given query.")
 
         ticket.assigned_to = technician
         ticket.status = Ticket.STATUS_ASSIGNED
@@ -134,26 +243,6 @@ class TicketViewSet(viewsets.ModelViewSet):
             performed_by=request.user
         )
 
-        # Notification
-        Notification.objects.create(
-            user=technician,
-            ticket=ticket,
-            message=f"You have been assigned a new ticket: {ticket.title}"
-        )
-
-        # Optional email
-        if technician.email:
-            try:
-                send_mail(
-                    subject=f"Ticket Assigned: {ticket.title}",
-                    message=f"You have been assigned a new ticket.\n\nTitle: {ticket.title}\nDescription: {ticket.description}",
-                    from_email="noreply@naita.lk",
-                    recipient_list=[technician.email],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
-
         return Response(
             {"message": f"Ticket assigned to {technician.get_full_name() or technician.username}"},
             status=status.HTTP_200_OK,
@@ -164,23 +253,24 @@ class TicketViewSet(viewsets.ModelViewSet):
     # ----------------------------
     @action(detail=False, methods=["get"], url_path="divisions", permission_classes=[permissions.AllowAny])
     def divisions(self, request):
-        divisions = Division.objects.all()
-        serializer = DivisionSerializer(divisions, many=True)
-        return Response(serializer.data)
+        return reference_response(
+            request, "divisions", [DIVISIONS], lambda: DivisionSerializer(Division.objects.all(), many=True).data
+        )
 
     # ----------------------------
     # Branches
     # ----------------------------
     @action(detail=False, methods=["get"], url_path="branches", permission_classes=[permissions.AllowAny])
     def branches(self, request):
-        branches = Branch.objects.all()
-        serializer = BranchSerializer(branches, many=True)
-        return Response(serializer.data)
+        return reference_response(
+            request, "branches", [BRANCHES], lambda: BranchSerializer(Branch.objects.all(), many=True).data
+        )
 
     # ----------------------------
     # Update Ticket Status
     # ----------------------------
     @action(detail=True, methods=["patch"], url_path="status")
+    @transaction.atomic
     def update_status(self, request, pk=None):
         ticket = self.get_object()
         serializer = TicketStatusUpdateSerializer(data=request.data, partial=True)
@@ -198,12 +288,6 @@ class TicketViewSet(viewsets.ModelViewSet):
             comment=comment
         )
 
-        Notification.objects.create(
-            user=ticket.created_by,
-            ticket=ticket,
-            message=f"Ticket '{ticket.title}' status updated to {ticket.status}"
-        )
-
         return Response({
             "message": f"Ticket status updated to {ticket.status}",
             "ticket": TicketSerializer(ticket).data
@@ -238,23 +322,26 @@ class TicketViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="completed")
     def completed_tickets(self, request):
         tickets = Ticket.objects.filter(status=Ticket.STATUS_COMPLETED).order_by("-completed_at")
-        serializer = TicketSerializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request, tickets, scope=ALL, serialize=lambda rows: TicketSerializer(rows, many=True).data
+        )
 
 
 # ======================================================
-# Notification ViewSet
+# Reference Data
 # ======================================================
-class NotificationViewSet(viewsets.ModelViewSet):
-    serializer_class = NotificationSerializer
-    permission_classes = [permissions.IsAuthenticated]
+@api_view(["GET"])
+@authentication_classes(CLAIMS_AUTHENTICATION_CLASSES)
+@permission_classes([permissions.AllowAny])
+def reference_data(request):
+    """Branches, divisions (with their category ids) and categories for ticket forms, in one response."""
+    def build():
+        return {
+            "branches": BranchSerializer(Branch.objects.all(), many=True).data,
+            "divisions": DivisionReferenceSerializer(
+                Division.objects.prefetch_related("categories"), many=True
+            ).data,
+            "categories": CategorySerializer(Category.objects.all(), many=True).data,
+        }
 
-    def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by("-created_at")
-
-    @action(detail=True, methods=["post"])
-    def read(self, request, pk=None):
-        notification = self.get_object()
-        notification.read = True
-        notification.save()
-        return Response({"message": "Notification marked as read"})
+    return reference_response(request, "reference", [BRANCHES, DIVISIONS, CATEGORIES], build)
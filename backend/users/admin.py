@@ -10,9 +10,10 @@ class CustomUserAdmin(UserAdmin):
     fieldsets = (
         (None, {"fields": ("username", "password")}),
         ("Personal info", {"fields": ("full_name", "email")}),
-        ("Roles & Branch", {"fields": ("role", "branch")}),
+        ("Roles & Branch", {"fields": ("role", "branch", "divisions")}),
         ("Permissions", {"fields": ("is_staff", "is_active")}),
     )
+    filter_horizontal = ("divisions",)
 
 
 admin.site.register(User, CustomUserAdmin)
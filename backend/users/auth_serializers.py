@@ -1,12 +1,15 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from .tokens import add_profile_claims
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token["role"] = getattr(user, "role", "").lower()
-        token["branch"] = getattr(user.branch, "name", None) if user.branch else None
-        return token
+        return add_profile_claims(token, user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
@@ -20,3 +23,25 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             "is_active": self.user.is_active,
         }
         return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads role and branch from the user on every refresh, so a demoted or
+    moved user loses the old scope when the current access token expires
+    instead of keeping it for the whole refresh lifetime. Reads the row itself,
+    not the identity cache: once per access lifetime, and never stale.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = get_user_model()._default_manager.filter(
+            **{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}
+        ).select_related("branch").first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        data["access"] = str(add_profile_claims(access, user))
+        if "refresh" in data:
+            data["refresh"] = str(add_profile_claims(RefreshToken(data["refresh"]), user))
+        return data
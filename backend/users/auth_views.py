@@ -1,5 +1,9 @@
-from rest_framework_simplejwt.views import TokenObtainPairView
-from .auth_serializers import CustomTokenObtainPairSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .auth_serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
@@ -0,0 +1,44 @@
+# users/authentication.py
+
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .tokens import ClaimsUser
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Bearer JWT authenticated into a ClaimsUser (id, role, branch_id from the
+    token) without loading the user row. Like any stateless JWT, a disabled,
+    demoted or moved user keeps the old access until this access token
+    expires (ACCESS_TOKEN_LIFETIME); refreshing re-reads the claims
+    (CustomTokenRefreshSerializer). Tokens issued before the profile claims
+    fall back to the full user.
+    """
+
+    def get_user(self, validated_token):
+        user = ClaimsUser(validated_token)
+        if not user.has_profile_claims:
+            return super().get_user(validated_token)
+        return user
+
+
+# Bearer tokens first, so token clients never touch the session
+CLAIMS_AUTHENTICATION_CLASSES = [ClaimsJWTAuthentication, SessionAuthentication, TokenAuthentication]
+
+
+class ClaimsAuthenticationMixin:
+    """
+    Viewset mixin: the actions in `claims_actions` only need the user's id,
+    role and branch, so they authenticate with CLAIMS_AUTHENTICATION_CLASSES;
+    every other action keeps `authentication_classes` and the full User.
+    """
+
+    claims_actions = ()
+
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+        # The action is only known now; authentication itself runs later, in initial()
+        if self.action in self.claims_actions:
+            request.authenticators = [auth() for auth in CLAIMS_AUTHENTICATION_CLASSES]
+        return request
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0020_alter_ticket_file'),
+        ('users', '0005_user_phone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='divisions',
+            field=models.ManyToManyField(blank=True, help_text='Divisions a technician handles (empty means all divisions)', related_name='technicians', to='tickets.division'),
+        ),
+    ]
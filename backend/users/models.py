@@ -33,6 +33,13 @@ class User(AbstractUser):
         help_text="Branch where the user belongs"
     )
 
+    divisions = models.ManyToManyField(
+        "tickets.Division",
+        blank=True,
+        related_name="technicians",
+        help_text="Divisions a technician handles (empty means all divisions)"
+    )
+
     groups = models.ManyToManyField(
         Group,
         related_name="custom_user_set",
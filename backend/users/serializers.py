@@ -21,6 +21,7 @@ class UserSerializer(serializers.ModelSerializer):
             "role",
             "branch",
             "branch_name",
+            "divisions",
             "password",
             "phone",
             "is_active",
@@ -62,6 +63,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token["role"] = getattr(user, "role", "")
         token["branch"] = getattr(user.branch, "name", None)
+        token["branch_id"] = user.branch_id
         return token
 
     def validate(self, attrs):
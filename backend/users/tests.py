@@ -1,3 +1,74 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from branches.models import Branch
+from naita_servicedesk.identity import user_cache
+from .models import User
+
+
+# ======================================================
+# Identity Cache
+# ======================================================
+class UserIdentityCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", "staff@naita.lk", "pw", role="STAFF")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_password_hash_is_not_cached(self):
+        user_cache.get(self.user.pk)
+        cached = cache.get(user_cache.key(self.user.pk))
+        self.assertEqual(cached.username, "staff")
+        self.assertNotIn("password", cached.__dict__)
+
+    def test_save_invalidates_and_bulk_update_needs_invalidate(self):
+        self.assertEqual(user_cache.get(self.user.pk).role, "STAFF")
+
+        self.user.role = "TECHNICIAN"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(user_cache.get(self.user.pk).role, "TECHNICIAN")
+
+        User.objects.filter(pk=self.user.pk).update(role="ADMIN")
+        self.assertEqual(user_cache.get(self.user.pk).role, "TECHNICIAN")
+        user_cache.invalidate(self.user.pk)
+        self.assertEqual(user_cache.get(self.user.pk).role, "ADMIN")
+
+
+# ======================================================
+# Token Refresh
+# ======================================================
+class TokenRefreshClaimsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.colombo = Branch.objects.create(name="Colombo")
+        cls.galle = Branch.objects.create(name="Galle")
+        cls.user = User.objects.create_user("staff", "staff@naita.lk", "pw", role="STAFF", branch=cls.colombo)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.refresh = self.client.post(
+            "/api/auth/login/", {"username": "staff", "password": "pw"}, format="json"
+        ).data["refresh"]
+
+    def refreshed(self):
+        return self.client.post("/api/auth/refresh/", {"refresh": self.refresh}, format="json")
+
+    def test_refresh_reloads_role_and_branch(self):
+        # Warm the identity cache with the old row; refresh must not use it
+        user_cache.get(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(role="TECHNICIAN", branch=self.galle)
+
+        access = AccessToken(self.refreshed().data["access"])
+        self.assertEqual(access["role"], "technician")
+        self.assertEqual(access["branch_id"], self.galle.pk)
+        self.assertEqual(access["branch"], "Galle")
+
+    def test_refresh_rejects_deactivated_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.refreshed().status_code, 401)
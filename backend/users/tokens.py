@@ -0,0 +1,69 @@
+# users/tokens.py
+
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from naita_servicedesk.identity import cached_related, user_cache
+
+# Claims that let a token stand in for the user row
+PROFILE_CLAIMS = ("role", "branch_id")
+
+
+def add_profile_claims(token, user):
+    """Put what the realtime layer needs to route a user into the token."""
+    token["role"] = (getattr(user, "role", "") or "").lower()
+    token["branch"] = getattr(cached_related(user, "branch"), "name", None)
+    token["branch_id"] = user.branch_id
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from a validated access token alone, without a query.
+    Exposes `role` (upper-case like User.Roles) and `branch_id` from the claims;
+    any other User attribute loads the row (through the identity cache) on
+    first use. Filter querysets by `user.pk`, not by the object itself.
+    """
+
+    @cached_property
+    def id(self):
+        # SimpleJWT stores the user id as a string claim
+        user_id = self.token[api_settings.USER_ID_CLAIM]
+        return int(user_id) if str(user_id).isdigit() else user_id
+
+    @cached_property
+    def role(self):
+        return (self.token.get("role") or "").upper()
+
+    @cached_property
+    def branch_id(self):
+        return self.token.get("branch_id")
+
+    @property
+    def has_profile_claims(self):
+        return all(claim in self.token for claim in PROFILE_CLAIMS)
+
+    # Not claims here: answer from the row instead of TokenUser's token defaults
+    @property
+    def username(self):
+        return self.instance.username
+
+    @property
+    def is_staff(self):
+        return self.instance.is_staff
+
+    @property
+    def is_superuser(self):
+        return self.instance.is_superuser
+
+    @cached_property
+    def instance(self):
+        """The User row, for views that need the model."""
+        return user_cache.get(self.id)
+
+    def __getattr__(self, name):
+        # Only reached for attributes the claims don't provide (full_name, email, ...)
+        if name.startswith("_") or name in ("instance", "token"):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from .models import User
 from .serializers import UserSerializer
 from .permissions import IsAdmin
+from tickets.assignment import workload_index
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -36,7 +37,10 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="technicians")
     def technicians(self, request):
-        """Return all users with role 'technician'"""
+        """Return all users with role 'technician' along with their open ticket load"""
         technicians = User.objects.filter(role__iexact="technician").order_by("id")
         serializer = self.get_serializer(technicians, many=True)
-        return Response(serializer.data)
+        data = serializer.data
+        for item in data:
+            item["open_tickets"] = workload_index.load(item["id"])
+        return Response(data)
@@ -10,11 +10,32 @@ export interface Notification {
   created_at: string;
 }
 
-export const fetchNotifications = async (): Promise<Notification[]> => {
-  const { data } = await api.get("/notifications/");
+export interface NotificationPage {
+  results: Notification[];
+  next: string | null;
+  previous: string | null;
+  unread_count: number;
+}
+
+// Newest page of the cursor-paginated feed (pass `next` to load older ones)
+export const fetchNotifications = async (cursorUrl?: string): Promise<NotificationPage> => {
+  const { data } = await api.get(cursorUrl || "/notifications/");
   return data;
 };
 
+export const fetchUnreadCount = async (): Promise<number> => {
+  const { data } = await api.get("/notifications/unread_count/");
+  return data.unread_count;
+};
+
 export const markNotificationRead = async (id: number) => {
   await api.post(`/notifications/${id}/read/`);
 };
+
+export const markNotificationsRead = async (ids: number[]) => {
+  await api.post("/notifications/mark_read/", { ids });
+};
+
+export const markAllNotificationsRead = async () => {
+  await api.post("/notifications/mark_all_read/");
+};
@@ -156,12 +156,28 @@ export const fetchCategories = async (): Promise<Category[]> => {
   return data || [];
 };
 
+export interface ReferenceData {
+  branches: Branch[];
+  divisions: (Division & { categories: number[] })[];
+  categories: Category[];
+}
+
+// All three lists in one cached response
+export const fetchReferenceData = async (): Promise<ReferenceData> => {
+  const { data } = await api.get<ReferenceData>("reference/");
+  return {
+    branches: data?.branches || [],
+    divisions: data?.divisions || [],
+    categories: data?.categories || [],
+  };
+};
+
 // ======================
 // Notifications
 // ======================
 export const fetchNotifications = async (): Promise<Notification[]> => {
-  const { data } = await api.get<Notification[]>("notifications/");
-  return data || [];
+  const { data } = await api.get<{ results: Notification[] }>("notifications/");
+  return data?.results || [];
 };
 
 export const markNotificationAsRead = async (id: number) => {
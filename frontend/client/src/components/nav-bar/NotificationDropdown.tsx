@@ -13,6 +13,7 @@ import TicketDetailsModal from "../ticketsComponents/TicketDetailsModel";
 
 export default function NotificationDropdown() {
   const [notifications, setNotifications] = useState<Notification[]>([]);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [open, setOpen] = useState(false);
   const [selectedTicket, setSelectedTicket] = useState<number | null>(null);
 
@@ -20,7 +21,8 @@ export default function NotificationDropdown() {
   const loadNotifications = async () => {
     try {
       const data = await fetchNotifications();
-      setNotifications(data);
+      setNotifications(data.results);
+      setUnreadCount(data.unread_count);
     } catch (error) {
       console.error("Failed to load notifications:", error);
     }
@@ -41,8 +43,6 @@ export default function NotificationDropdown() {
     loadNotifications();
   }, []);
 
-  const unreadCount = notifications.filter((n) => !n.read).length;
-
   return (
     <div className="relative">
       {/* Bell Icon */}
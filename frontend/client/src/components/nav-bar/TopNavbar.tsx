@@ -19,6 +19,7 @@ interface TopNavbarProps {
 const TopNavbar: React.FC<TopNavbarProps> = ({ title = "Dashboard", onMenuToggle, currentUser }) => {
   const { logout } = useAuth();
   const [notifications, setNotifications] = useState<Notification[]>([]);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [notifOpen, setNotifOpen] = useState(false);
   const [dropdownOpen, setDropdownOpen] = useState(false);
   const [profileOpen, setProfileOpen] = useState(false);
@@ -43,7 +44,8 @@ const TopNavbar: React.FC<TopNavbarProps> = ({ title = "Dashboard", onMenuToggle
   const fetchNotificationsData = async () => {
     try {
       const data = await fetchNotifications();
-      setNotifications(data);
+      setNotifications(data.results);
+      setUnreadCount(data.unread_count);
     } catch (error) {
       console.error("Failed to fetch notifications:", error);
     }
@@ -62,8 +64,6 @@ const TopNavbar: React.FC<TopNavbarProps> = ({ title = "Dashboard", onMenuToggle
     fetchNotificationsData();
   }, []);
 
-  const unreadCount = notifications.filter((n) => !n.read).length;
-
   const handleLogout = () => {
     logout();
     setDropdownOpen(false);
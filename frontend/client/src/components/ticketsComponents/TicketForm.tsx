@@ -6,9 +6,7 @@ import { toast } from "react-hot-toast";
 import { Loader2 } from "lucide-react";
 import {
   createTicket,
-  fetchBranches,
-  fetchDivisions,
-  fetchCategories,
+  fetchReferenceData,
   TicketPriority,
 } from "@/api/tickets";
 
@@ -48,11 +46,11 @@ const CreateTicket: React.FC = () => {
   useEffect(() => {
     const loadData = async () => {
       try {
-        const [branchData, divisionData, categoryData] = await Promise.all([
-          fetchBranches(),
-          fetchDivisions(),
-          fetchCategories(),
-        ]);
+        const {
+          branches: branchData,
+          divisions: divisionData,
+          categories: categoryData,
+        } = await fetchReferenceData();
 
         // Ensure only id and name are used
         const clean = (arr: any[]) => arr.map((item) => ({ id: item.id, name: item.name }));
@@ -7,43 +7,105 @@ type OnNotify = (payload: any) => void;
 export default function useNotifications(onNotify?: OnNotify) {
   const [notifications, setNotifications] = useState<any[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
+  // newest notification id seen, sent as last_id so a reconnect replays only what was missed
+  const lastIdRef = useRef<number>(0);
 
   useEffect(() => {
-    // fetch initial notifications
+    // fetch initial notifications (again when the server asks for a resync)
     let mounted = true;
-    api.get("/notifications/").then((res) => {
-      if (!mounted) return;
-      setNotifications(res.data || []);
-    }).catch(console.error);
+    const load = () =>
+      api.get("/notifications/").then((res) => {
+        if (!mounted) return;
+        const results = res.data?.results || [];
+        lastIdRef.current = Math.max(lastIdRef.current, ...results.map((n: any) => n.id));
+        setNotifications(results);
+      }).catch(console.error);
+    load();
 
     // connect websocket
     const token = localStorage.getItem("token");
     // use wss in prod and ws in dev
     const protocol = window.location.protocol === "https:" ? "wss" : "ws";
     const host = window.location.host; // includes port
-    // include token as query param if your consumer supports token auth fallback
-    const url = `${protocol}://${host}/ws/notifications/${token ? `?token=${token}` : ""}`;
-
-    const ws = new WebSocket(url);
-    wsRef.current = ws;
-
-    ws.onopen = () => console.log("Notifications WS connected");
-    ws.onmessage = (event) => {
-      try {
-        const payload = JSON.parse(event.data);
-        // push into state
-        setNotifications((prev) => [payload, ...prev]);
-        if (onNotify) onNotify(payload);
-      } catch (err) {
-        console.error("Failed to parse WS message", err);
-      }
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let stream: EventSource | null = null;
+
+    // merge a batch (oldest first) into state
+    const applyBatch = (batch: any[]) => {
+      const ids = new Set(batch.map((n) => n.id));
+      lastIdRef.current = Math.max(lastIdRef.current, ...batch.map((n) => n.id));
+      // push into state (a coalesced notification replaces its older copy)
+      setNotifications((prev) => [...[...batch].reverse(), ...prev.filter((n) => !ids.has(n.id))]);
+      if (onNotify) batch.forEach((payload) => onNotify(payload));
+    };
+
+    // Server-Sent Events fallback for networks that block WebSockets;
+    // EventSource reconnects by itself and resumes via Last-Event-ID
+    const startStream = () => {
+      const params = new URLSearchParams();
+      if (token) params.set("token", token);
+      if (lastIdRef.current) params.set("last_id", String(lastIdRef.current));
+      stream = new EventSource(`${api.defaults.baseURL}notifications/stream/?${params.toString()}`);
+      stream.addEventListener("notification", (event) => {
+        try {
+          applyBatch([JSON.parse((event as MessageEvent).data)]);
+        } catch (err) {
+          console.error("Failed to parse SSE message", err);
+        }
+      });
+      stream.addEventListener("resync", () => load());
+    };
+
+    const connect = () => {
+      const params = new URLSearchParams();
+      if (token) params.set("token", token);
+      if (lastIdRef.current) params.set("last_id", String(lastIdRef.current));
+      // acknowledge every frame so the server paces what it sends
+      params.set("ack", "1");
+      const query = params.toString();
+      const url = `${protocol}://${host}/ws/notifications/${query ? `?${query}` : ""}`;
+
+      const ws = new WebSocket(url);
+      wsRef.current = ws;
+
+      let opened = false;
+      ws.onopen = () => {
+        opened = true;
+        console.log("Notifications WS connected");
+      };
+      ws.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          // server fell behind and dropped events: refetch the feed
+          if (data?.type === "resync") {
+            load();
+            return;
+          }
+          // one frame carries a batch, oldest first
+          applyBatch(Array.isArray(data) ? data : [data]);
+        } catch (err) {
+          console.error("Failed to parse WS message", err);
+        } finally {
+          if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({ action: "ack" }));
+        }
+      };
+      ws.onclose = () => {
+        console.log("Notifications WS closed");
+        if (!mounted) return;
+        // never connected: WebSockets are likely blocked, use the SSE stream
+        if (!opened) startStream();
+        // reconnect and replay from lastIdRef instead of refetching everything
+        else reconnectTimer = setTimeout(connect, 3000);
+      };
+      ws.onerror = (e) => console.error("WS error", e);
     };
-    ws.onclose = () => console.log("Notifications WS closed");
-    ws.onerror = (e) => console.error("WS error", e);
+    connect();
 
     return () => {
       mounted = false;
-      ws.close();
+      clearTimeout(reconnectTimer);
+      stream?.close();
+      wsRef.current?.close();
       wsRef.current = null;
     };
   }, [onNotify]);
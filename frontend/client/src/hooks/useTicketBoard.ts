@@ -0,0 +1,78 @@
+import { useEffect, useRef } from "react";
+
+export type BoardFilter = {
+  branch?: number;
+  status?: string[];
+  assigned_to?: number | "none";
+};
+
+export type BoardTicket = {
+  id: number;
+  title: string;
+  status: string;
+  priority: string;
+  branch_id: number | null;
+  division_id: number | null;
+  category_id: number | null;
+  assigned_to_id: number | null;
+  created_by_id: number;
+  is_overdue: boolean;
+  due_date: string | null;
+  updated_at: string | null;
+};
+
+export type BoardDelta = { type: "insert" | "update" | "remove"; ticket: BoardTicket };
+
+// Live ticket board: subscribes with a filter and reports insert/update/remove
+// deltas for matching tickets (the server narrows the filter to the user's role).
+// onSubscribed fires on every (re)subscribe: load the list there so nothing is missed.
+export default function useTicketBoard(
+  filter: BoardFilter,
+  onDelta: (delta: BoardDelta) => void,
+  onSubscribed?: () => void
+) {
+  const onDeltaRef = useRef(onDelta);
+  onDeltaRef.current = onDelta;
+  const onSubscribedRef = useRef(onSubscribed);
+  onSubscribedRef.current = onSubscribed;
+  const filterKey = JSON.stringify(filter);
+
+  useEffect(() => {
+    let mounted = true;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let ws: WebSocket | null = null;
+
+    const token = localStorage.getItem("token");
+    const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+    const host = window.location.host;
+
+    const connect = () => {
+      ws = new WebSocket(`${protocol}://${host}/ws/tickets/${token ? `?token=${token}` : ""}`);
+      ws.onopen = () => ws?.send(JSON.stringify({ action: "subscribe", ...JSON.parse(filterKey) }));
+      ws.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          if (data.type === "insert" || data.type === "update" || data.type === "remove") {
+            onDeltaRef.current(data);
+          } else if (data.type === "subscribed") {
+            onSubscribedRef.current?.();
+          } else if (data.type === "error") {
+            console.error("Ticket board:", data.detail);
+          }
+        } catch (err) {
+          console.error("Failed to parse ticket board message", err);
+        }
+      };
+      ws.onclose = () => {
+        if (mounted) reconnectTimer = setTimeout(connect, 3000);
+      };
+    };
+    connect();
+
+    return () => {
+      mounted = false;
+      clearTimeout(reconnectTimer);
+      ws?.close();
+    };
+  }, [filterKey]);
+}
@@ -18,9 +18,9 @@ import {
   Legend,
 } from "recharts";
 import { fetchAssignedTickets, fetchTicketHistory, Ticket, TicketHistoryEntry } from "@/api/tickets";
+import useTicketBoard, { BoardDelta } from "@/hooks/useTicketBoard";
 
 const PIE_COLORS = ["#10B981", "#3B82F6", "#FACC15", "#F87171", "#9CA3AF"];
-const REFRESH_INTERVAL = 5000;
 
 const TechnicianDashboard: React.FC = () => {
   const [tickets, setTickets] = useState<Ticket[]>([]);
@@ -54,11 +54,30 @@ const TechnicianDashboard: React.FC = () => {
 
   useEffect(() => {
     loadTickets();
-    const interval = setInterval(() => {
-      if (!selectedTicket) loadTickets(); // Skip refresh while modal open
-    }, REFRESH_INTERVAL);
-    return () => clearInterval(interval);
-  }, [selectedTicket]);
+  }, []);
+
+  // Live updates instead of polling: the server scopes the board to this technician
+  const handleDelta = ({ type, ticket }: BoardDelta) => {
+    if (type === "remove") {
+      setTickets((prev) => prev.filter((t) => t.id !== ticket.id));
+    } else if (type === "update") {
+      setTickets((prev) =>
+        prev.map((t) =>
+          t.id === ticket.id
+            ? {
+                ...t,
+                title: ticket.title,
+                status: ticket.status as Ticket["status"],
+                priority: ticket.priority as Ticket["priority"],
+              }
+            : t
+        )
+      );
+    } else {
+      loadTickets(); // new ticket: fetch its full row
+    }
+  };
+  useTicketBoard({}, handleDelta, loadTickets); // reload on reconnect
 
   // Compute ticket status counts
   const statusCount = useMemo(